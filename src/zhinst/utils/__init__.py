@@ -1,5 +1,6 @@
 """Zurich Instruments LabOne Utils for the Core Python API."""
 from zhinst.utils.utils import *
+from zhinst.utils.auto_generate_functions import batched_config
 from zhinst.utils import shfqa
 from zhinst.utils import shfqc
 from zhinst.utils import shfsg
@@ -15,6 +16,7 @@ except ModuleNotFoundError:
 __all__ = [
     "utils",
     "create_api_session",
+    "clear_discovery_cache",
     "api_server_version_check",
     "default_output_mixer_channel",
     "autoDetect",
@@ -37,6 +39,10 @@ __all__ = [
     "disable_everything",
     "convert_awg_waveform",
     "parse_awg_waveform",
+    "get_device_features",
+    "clear_device_feature_cache",
+    "clear_upload_cache",
+    "batched_config",
     "shf_sweeper",
     "shfqa",
     "shfqc",
@@ -1,9 +1,15 @@
 """Zurich Instruments LabOne Python API functions for automatic code generation."""
 import re
+import threading
 import typing as t
+from contextlib import contextmanager
 
 from zhinst.core import ziDAQServer
 
+# Settings of the active batched_config() blocks of the current thread, per
+# API session.
+_BATCHES = threading.local()
+
 _DAQ_ARG = (
     """        daq: Instance of a Zurich Instruments API session"""
     + """ connected to a Data
@@ -102,8 +108,7 @@ def configure_maker(
     """
 
     def configure_func(daq: ziDAQServer, *args, **kwargs) -> None:
-        settings = get_setting_func(*args, **kwargs)
-        daq.set(settings)
+        _apply_settings(daq, get_setting_func(*args, **kwargs))
 
     configure_func.__doc__ = (
         build_docstring_from_old_one(get_setting_func.__doc__)
@@ -112,3 +117,65 @@ def configure_maker(
     )
     configure_func.__module__ = get_setting_func.__module__
     return configure_func
+
+
+def _apply_settings(daq: ziDAQServer, settings: t.List[t.Tuple[str, t.Any]]) -> None:
+    """Applies settings, or defers them if a batched_config() block is active.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server.
+        settings: Settings to apply.
+    """
+    batch = getattr(_BATCHES, "settings", {}).get(id(daq))
+    if batch is not None:
+        batch.extend(settings)
+    else:
+        daq.set(settings)
+
+
+@contextmanager
+def batched_config(daq: ziDAQServer) -> t.Iterator[t.List[t.Tuple[str, t.Any]]]:
+    """Context manager which applies the settings of multiple configure calls at once.
+
+    Within the context, all ``configure_*`` functions of the SHFQA, SHFSG and
+    SHFQC utils (e.g. ``configure_scope`` or ``configure_channel``) that are
+    called with the given session only collect their settings. When the context
+    is left, all collected settings are applied in a single transaction. If an
+    exception is raised within the context, none of the settings are applied.
+
+    Functions that directly interact with the device, such as
+    ``load_sequencer_program`` or ``enable_scope``, are not deferred and are
+    therefore executed before the collected settings are applied.
+
+    Nested contexts for the same session are merged into the outermost one.
+
+    Example:
+        >>> with batched_config(daq):
+        ...     shfqa.configure_channel(daq, device_id, 0, ...)
+        ...     shfqa.configure_scope(daq, device_id, ...)
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server.
+
+    Yields:
+        The list of collected settings.
+
+    .. versionadded:: 0.5
+    """
+    batches = getattr(_BATCHES, "settings", None)
+    if batches is None:
+        batches = _BATCHES.settings = {}
+    if id(daq) in batches:
+        yield batches[id(daq)]
+        return
+
+    settings: t.List[t.Tuple[str, t.Any]] = []
+    batches[id(daq)] = settings
+    try:
+        yield settings
+    finally:
+        del batches[id(daq)]
+    if settings:
+        daq.set(settings)
@@ -6,12 +6,17 @@ __all__ = [
     "SHFQA_MAX_SIGNAL_GENERATOR_WAVEFORM_LENGTH",
     "SHFQA_MAX_SIGNAL_GENERATOR_CARRIER_COUNT",
     "SHFQA_SAMPLING_FREQUENCY",
+    "Mode",
     "max_qubits_per_channel",
     "load_sequencer_program",
+    "load_sequencer_program_async",
     "configure_scope",
+    "ScopeData",
     "get_scope_data",
+    "get_scope_data_async",
     "enable_sequencer",
     "write_to_waveform_memory",
+    "write_to_waveform_memory_multi",
     "start_continuous_sw_trigger",
     "enable_scope",
     "configure_weighted_integration",
@@ -1,21 +1,81 @@
 """Zurich Instruments LabOne Python API Utility functions for SHFQA."""
 
+import asyncio
 import time
-from functools import partial
+from enum import IntEnum
+from functools import lru_cache, partial
 import typing as t
 
 import numpy as np
-from zhinst.utils.utils import wait_for_state_change
+from zhinst.utils.utils import (
+    _DEVICE_CACHES,
+    _compile_seqc,
+    _is_uploaded,
+    _session_key,
+    _set_uploaded,
+    _upload_digest,
+    get_device_features,
+    wait_for_state_change,
+    wait_for_state_change_async,
+)
 from zhinst.utils.auto_generate_functions import (
     configure_maker,
     build_docstring_configure,
 )
-from zhinst.core import ziDAQServer, compile_seqc
+from zhinst.core import ziDAQServer
 
 SHFQA_MAX_SIGNAL_GENERATOR_WAVEFORM_LENGTH = 4 * 2**10
 SHFQA_MAX_SIGNAL_GENERATOR_CARRIER_COUNT = 16
 SHFQA_SAMPLING_FREQUENCY = 2e9
 
+# Node path templates of the per channel branches, formatted with
+# ``(device_id, channel_index)`` or ``(device_id, channel_index, mode)``.
+_GENERATOR_PATH = "/%s/qachannels/%s/generator/"
+_INTEGRATION_PATH = "/%s/qachannels/%s/readout/integration/"
+_RESULT_PATH = "/%s/qachannels/%s/%s/result/"
+
+# Waveforms and integration weights are uploaded with single precision. The
+# device resolves their samples with at most 16 bits per quadrature, so the
+# 24 bit significand of complex64 loses no precision compared to complex128
+# while halving the transferred data.
+_WAVE_DTYPE = np.complex64
+
+
+@lru_cache(maxsize=256)
+def _node_path(template: str, *args: t.Union[str, int]) -> str:
+    """Returns the node path of a template, cached for repeated calls."""
+    return template % args
+
+
+class Mode(IntEnum):
+    """Operating modes of a QA channel.
+
+    Can be used instead of the mode strings, e.g. ``mode=Mode.READOUT``.
+
+    .. versionadded:: 0.5
+    """
+
+    SPECTROSCOPY = 0
+    READOUT = 1
+
+
+@lru_cache(maxsize=None)
+def _mode_name(mode: t.Union[str, Mode]) -> str:
+    """Returns the node name of a mode, e.g. "readout"."""
+    try:
+        valid_mode = Mode[mode.upper()] if isinstance(mode, str) else Mode(mode)
+    except (KeyError, ValueError):
+        raise ValueError(
+            f'mode was set to {mode} but only "spectroscopy" and "readout" are '
+            "allowed"
+        ) from None
+    return valid_mode.name.lower()
+
+
+# Number of qubits per (API session, device), see max_qubits_per_channel().
+_MAX_QUBITS_CACHE: t.Dict[t.Tuple[int, str], int] = {}
+_DEVICE_CACHES.append(_MAX_QUBITS_CACHE)
+
 
 def max_qubits_per_channel(daq: ziDAQServer, device_id: str) -> int:
     """Returns the maximum number of supported qubits per channel.
@@ -25,8 +85,20 @@ def max_qubits_per_channel(daq: ziDAQServer, device_id: str) -> int:
             Server. The device with identifier device_id is assumed to already
             be connected to this instance.
         device_id: SHFQA device identifier, e.g. `dev12004` or 'shf-dev12004'.
+
+    .. versionchanged:: 0.5
+
+        The value is only queried once per API session and device. Use
+        :func:`zhinst.utils.clear_device_feature_cache` to reset it.
     """
-    return len(daq.listNodes(f"/{device_id}/qachannels/0/readout/integration/weights"))
+    key = (_session_key(daq), device_id.lower())
+    max_qubits = _MAX_QUBITS_CACHE.get(key)
+    if max_qubits is None:
+        max_qubits = len(
+            daq.listNodes(f"/{device_id}/qachannels/0/readout/integration/weights")
+        )
+        _MAX_QUBITS_CACHE[key] = max_qubits
+    return max_qubits
 
 
 def load_sequencer_program(
@@ -34,15 +106,18 @@ def load_sequencer_program(
     device_id: str,
     channel_index: int,
     sequencer_program: str,
+    *,
+    timeout: float = 10,
+    skip_unchanged: bool = False,
     **_,
 ) -> None:
     """Compiles and loads a program to a specified sequencer.
 
-    This function is composed of 4 steps:
-        1. Reset the generator to ensure a clean state.
-        2. Compile the sequencer program with the offline compiler.
-        3. Upload the compiled binary elf file.
-        4. Validate that the upload was successful and the generator is ready
+    This function is composed of 3 steps:
+        1. Compile the sequencer program with the offline compiler.
+        2. Reset the generator to ensure a clean state and upload the compiled
+           binary elf file within a single transaction.
+        3. Validate that the upload was successful and the generator is ready
            again.
 
     Args:
@@ -53,31 +128,127 @@ def load_sequencer_program(
         channel_index: Index specifying to which sequencer the program below is
             uploaded - there is one sequencer per channel.
         sequencer_program: Sequencer program to be uploaded.
+        timeout: Maximum time to wait for the generator to be ready after the
+            upload in seconds.
+
+            .. versionadded:: 0.5
+        skip_unchanged: Skip the upload if the compiled program is identical
+            to the last one loaded to the sequencer with this API session.
+            The compiled program is also reused if the same sequencer program
+            was already compiled for the same device and channel. Changes to
+            waveform files or includes referenced by the program are not
+            detected, see :func:`zhinst.utils.clear_upload_cache`.
+
+            .. versionadded:: 0.5
 
     Raises:
         RuntimeError: If the Upload was not successfully or the device could not
             process the sequencer program.
     """
-    # Start by resetting the sequencer.
-    daq.syncSetInt(
-        f"/{device_id}/qachannels/{channel_index}/generator/reset",
-        1,
-    )
+    generator_path = _node_path(_GENERATOR_PATH, device_id, channel_index)
     # Compile the sequencer program.
-    device_type = daq.getString(f"/{device_id}/features/devtype")
-    device_options = daq.getString(f"/{device_id}/features/options")
-    elf, _ = compile_seqc(
-        sequencer_program, device_type, device_options, channel_index, sequencer="qa"
+    device_type, device_options = get_device_features(daq, device_id)
+    elf = _compile_seqc(
+        sequencer_program,
+        device_type,
+        device_options,
+        channel_index,
+        "qa",
+        cached=skip_unchanged,
     )
-    # Upload the binary elf file to the device.
-    daq.setVector(f"/{device_id}/qachannels/{channel_index}/generator/elf/data", elf)
+    digest = _upload_digest(elf)
+    if skip_unchanged and _is_uploaded(daq, generator_path + "elf/data", digest):
+        return
+    _set_uploaded(daq, generator_path + "elf/data")
+    # Reset the sequencer and upload the binary elf file to the device.
+    daq.set([(generator_path + "reset", 1), (generator_path + "elf/data", elf)])
+    daq.sync()
     # Validate that the upload was successful and the generator is ready again.
-    if not daq.get(
-        f"/{device_id}/qachannels/{channel_index}/generator/ready",
-    ):
+    try:
+        wait_for_state_change(daq, generator_path + "ready", 1, timeout=timeout)
+    except TimeoutError as error:
         raise RuntimeError(
             "The device did not not switch to into the ready state after the upload."
-        )
+        ) from error
+    _set_uploaded(daq, generator_path + "elf/data", digest)
+
+
+async def load_sequencer_program_async(
+    daq: ziDAQServer,
+    device_id: str,
+    channel_index: int,
+    sequencer_program: str,
+    *,
+    timeout: float = 10,
+    skip_unchanged: bool = False,
+) -> None:
+    """Compiles and loads a program to a specified sequencer without blocking.
+
+    Same as load_sequencer_program but runs it, including the wait for the
+    sequencer to be ready, in the default executor of the running event loop.
+    Compiling and uploading can therefore overlap with other tasks.
+
+    Warning:
+        The API session is used from the executor thread for the whole
+        duration of the upload. Since an API session must not be used from
+        several threads at once, uploads that run concurrently need separate
+        API sessions, and the session must not be used by other code until
+        the returned coroutine finished.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQA device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        channel_index: Index specifying to which sequencer the program below is
+            uploaded - there is one sequencer per channel.
+        sequencer_program: Sequencer program to be uploaded.
+        timeout: Maximum time to wait for the generator to be ready after the
+            upload in seconds.
+        skip_unchanged: Skip the upload if the compiled program is identical
+            to the last one loaded to the sequencer with this API session.
+            The compiled program is also reused if the same sequencer program
+            was already compiled for the same device and channel. Changes to
+            waveform files or includes referenced by the program are not
+            detected, see :func:`zhinst.utils.clear_upload_cache`.
+
+    Raises:
+        RuntimeError: If the Upload was not successfully or the device could not
+            process the sequencer program.
+
+    .. versionadded:: 0.5
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        None,
+        partial(
+            load_sequencer_program,
+            daq,
+            device_id,
+            channel_index,
+            sequencer_program,
+            timeout=timeout,
+            skip_unchanged=skip_unchanged,
+        ),
+    )
+
+
+@lru_cache(maxsize=16)
+def _scope_paths(device_id: str) -> t.Dict[str, str]:
+    """Returns the full paths of the static scope nodes of a device."""
+    scope_path = f"/{device_id}/scopes/0/"
+    nodes = (
+        "segments/count",
+        "segments/enable",
+        "averaging/enable",
+        "averaging/count",
+        "channels/*/enable",
+        "trigger/delay",
+        "trigger/channel",
+        "trigger/enable",
+        "length",
+    )
+    return {node: scope_path + node for node in nodes}
 
 
 def get_scope_settings(
@@ -116,12 +287,13 @@ def get_scope_settings(
             data acquisition and reception of a trigger.
     """
     scope_path = f"/{device_id}/scopes/0/"
+    paths = _scope_paths(device_id)
     settings = [
-        (scope_path + "segments/count", num_segments),
-        (scope_path + "segments/enable", 1 if num_segments > 1 else 0),
-        (scope_path + "averaging/enable", 1 if num_segments > 1 else 0),
-        (scope_path + "averaging/count", num_averages),
-        (scope_path + "channels/*/enable", 0),
+        (paths["segments/count"], num_segments),
+        (paths["segments/enable"], 1 if num_segments > 1 else 0),
+        (paths["averaging/enable"], 1 if num_segments > 1 else 0),
+        (paths["averaging/count"], num_averages),
+        (paths["channels/*/enable"], 0),
     ]
 
     for channel, selected_input in input_select.items():
@@ -129,15 +301,16 @@ def get_scope_settings(
             (scope_path + f"channels/{channel}/inputselect", selected_input)
         )
         settings.append((scope_path + f"channels/{channel}/enable", 1))
-        settings.append((scope_path + "trigger/delay", trigger_delay))
 
-        if trigger_input is not None:
-            settings.append((scope_path + "trigger/channel", trigger_input))
-            settings.append((scope_path + "trigger/enable", 1))
-        else:
-            settings.append((scope_path + "trigger/enable", 0))
+    # The trigger settings are shared by all scope channels.
+    settings.append((paths["trigger/delay"], trigger_delay))
+    if trigger_input is not None:
+        settings.append((paths["trigger/channel"], trigger_input))
+        settings.append((paths["trigger/enable"], 1))
+    else:
+        settings.append((paths["trigger/enable"], 0))
 
-    settings.append((scope_path + "length", num_samples))
+    settings.append((paths["length"], num_samples))
 
     return settings
 
@@ -151,7 +324,36 @@ configure_scope = configure_maker(
 )
 
 
-def get_scope_data(daq: ziDAQServer, device_id: str, *, timeout: float = 5.0) -> tuple:
+class ScopeData(t.NamedTuple):
+    """Data of a finished scope acquisition, as returned by get_scope_data.
+
+    As a named tuple it can still be unpacked into
+    ``recorded_data, recorded_data_range, scope_time``.
+
+    Attributes:
+        recorded_data: Contains an array per scope channel with the recorded
+            data. Channels that are not enabled contain an empty list.
+        recorded_data_range: Full scale range of each scope channel.
+        scope_time: Relative acquisition time for each point in recorded_data
+            in seconds starting from 0. The arrays are views of a single
+            shared time base.
+
+    .. versionadded:: 0.5
+    """
+
+    recorded_data: t.List[np.ndarray]
+    recorded_data_range: np.ndarray
+    scope_time: t.List[np.ndarray]
+
+
+def get_scope_data(
+    daq: ziDAQServer,
+    device_id: str,
+    *,
+    timeout: float = 5.0,
+    to_volts: bool = False,
+    wait: bool = True,
+) -> ScopeData:
     """Queries the scope for data once it is finished.
 
     Args:
@@ -160,48 +362,107 @@ def get_scope_data(daq: ziDAQServer, device_id: str, *, timeout: float = 5.0) ->
             be connected to this instance.
         device_id: SHFQA device identifier, e.g. `dev12004` or 'shf-dev12004'.
         timeout: Maximum time to wait for the scope data in seconds.
+        to_volts: Flag if the recorded data should be scaled to volts. The
+            scaling is done in-place on the received data.
+
+            .. versionadded:: 0.5
+
+        wait: Flag if the function should wait until the scope has finished
+            recording. Can be disabled if this is already known, e.g. after
+            waiting for the scope in a separate step.
+
+            .. versionadded:: 0.5
 
     Returns:
-        Three-element tuple with:
+        Three-element named tuple (see ScopeData) with:
             * recorded_data (array): Contains an array per scope channel with
                 the recorded data.
             * recorded_data_range (array): Full scale range of each scope
                 channel.
             * scope_time (array): Relative acquisition time for each point in
                 recorded_data in seconds starting from 0.
+
+    .. versionchanged:: 0.5
+
+        Returns a ScopeData named tuple and the full scale ranges as one array.
     """
-    # wait until scope has been triggered
-    wait_for_state_change(daq, f"/{device_id}/scopes/0/enable", 0, timeout=timeout)
+    scope_path = f"/{device_id}/scopes/0/".lower()
+    if wait:
+        # wait until scope has been triggered
+        wait_for_state_change(daq, scope_path + "enable", 0, timeout=timeout)
+
+    # query the channel states and the time base in a single request
+    scope_nodes = daq.get(
+        scope_path + "channels/*/enable," + scope_path + "time", flat=True
+    )
+    channels = range(4)
+    enabled_channels = [
+        channel
+        for channel in channels
+        if scope_nodes[scope_path + f"channels/{channel}/enable"]["value"][0]
+    ]
 
     # read and post-process the recorded data
     recorded_data = [[], [], [], []]
-    recorded_data_range = [0.0, 0.0, 0.0, 0.0]
+    voltage_per_lsb = np.zeros(len(channels))
     num_bits_of_adc = 14
     max_adc_range = 2 ** (num_bits_of_adc - 1)
 
-    channels = range(4)
-    for channel in channels:
-        if daq.getInt(f"/{device_id}/scopes/0/channels/{channel}/enable"):
-            path = f"/{device_id}/scopes/0/channels/{channel}/wave"
-            data = daq.get(path.lower(), flat=True)
-            vector = data[path]
-
-            recorded_data[channel] = vector[0]["vector"]
-            averagecount = vector[0]["properties"]["averagecount"]
-            scaling = vector[0]["properties"]["scaling"]
-            voltage_per_lsb = scaling * averagecount
-            recorded_data_range[channel] = voltage_per_lsb * max_adc_range
-
-    # generate the time base
-    scope_time = [[], [], [], []]
-    decimation_rate = 2 ** daq.getInt(f"/{device_id}/scopes/0/time")
+    wave_paths = {
+        channel: scope_path + f"channels/{channel}/wave" for channel in enabled_channels
+    }
+    data = daq.get(",".join(wave_paths.values()), flat=True) if wave_paths else {}
+    for channel, path in wave_paths.items():
+        vector = data[path]
+
+        wave = vector[0]["vector"]
+        properties = vector[0]["properties"]
+        voltage_per_lsb[channel] = properties["scaling"] * properties["averagecount"]
+        if to_volts:
+            if not np.issubdtype(wave.dtype, np.inexact):
+                wave = wave.astype(np.float64)
+            np.multiply(wave, voltage_per_lsb[channel], out=wave)
+        recorded_data[channel] = wave
+    recorded_data_range = voltage_per_lsb * max_adc_range
+
+    # generate the time base, shared by all channels as views of a single array
+    decimation_rate = 2 ** int(scope_nodes[scope_path + "time"]["value"][0])
     sampling_rate = SHFQA_SAMPLING_FREQUENCY / decimation_rate  # [Hz]
-    for channel in channels:
-        scope_time[channel] = (
-            np.array(range(0, len(recorded_data[channel]))) / sampling_rate
-        )
+    lengths = [len(recorded_data[channel]) for channel in channels]
+    time_base = np.arange(max(lengths), dtype=np.float64) * (1.0 / sampling_rate)
+    scope_time = [time_base[:length] for length in lengths]
+
+    return ScopeData(recorded_data, recorded_data_range, scope_time)
+
+
+async def get_scope_data_async(
+    daq: ziDAQServer, device_id: str, *, timeout: float = 5.0, to_volts: bool = False
+) -> ScopeData:
+    """Queries the scope for data once it is finished without blocking.
+
+    Same as get_scope_data but yields to the asyncio event loop while waiting
+    for the scope, so that e.g. the scopes of multiple devices can be awaited
+    concurrently. All requests, including the final data readout, are issued
+    from the event loop thread, since an API session must not be used from
+    several threads at once.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQA device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        timeout: Maximum time to wait for the scope data in seconds.
+        to_volts: Flag if the recorded data should be scaled to volts. The
+            scaling is done in-place on the received data.
 
-    return recorded_data, recorded_data_range, scope_time
+    Returns:
+        The recorded data, see get_scope_data.
+
+    .. versionadded:: 0.5
+    """
+    scope_path = f"/{device_id}/scopes/0/".lower()
+    await wait_for_state_change_async(daq, scope_path + "enable", 0, timeout=timeout)
+    return get_scope_data(daq, device_id, to_volts=to_volts, wait=False)
 
 
 def enable_sequencer(
@@ -218,15 +479,32 @@ def enable_sequencer(
             sequencer per channel.
         single: 1 - Disable sequencer after finishing execution.
                 0 - Restart sequencer after finishing execution.
+
+    Raises:
+        RuntimeError: If the sequencer could not be enabled.
+
+    .. versionchanged:: 0.5
+
+        Returns as soon as the device acknowledged the enable instead of
+        additionally waiting for 100 ms, and raises a RuntimeError if the
+        enable was not acknowledged.
     """
-    generator_path = f"/{device_id}/qachannels/{channel_index}/generator/"
+    generator_path = _node_path(_GENERATOR_PATH, device_id, channel_index)
     daq.setInt(
         generator_path + "single",
         single,
     )
-    daq.syncSetInt(generator_path + "enable", 1)
-    hundred_milliseconds = 0.1
-    time.sleep(hundred_milliseconds)
+    if not daq.syncSetInt(generator_path + "enable", 1):
+        raise RuntimeError(
+            "The sequencer could not be enabled. Please ensure that the "
+            "sequencer program is loaded and configured correctly."
+        )
+
+
+# Number of generator waveform slots per (API session, device), see
+# write_to_waveform_memory_multi().
+_NUM_WAVEFORMS_CACHE: t.Dict[t.Tuple[int, str], int] = {}
+_DEVICE_CACHES.append(_NUM_WAVEFORMS_CACHE)
 
 
 def write_to_waveform_memory(
@@ -236,6 +514,7 @@ def write_to_waveform_memory(
     waveforms: dict,
     *,
     clear_existing: bool = True,
+    smart_clear: bool = True,
 ) -> None:
     """Writes pulses to the waveform memory of a specified generator.
 
@@ -248,24 +527,89 @@ def write_to_waveform_memory(
             written to - there is one generator per channel.
         waveforms: Dictionary of waveforms, the key specifies the slot to which
             to write the value which is a complex array containing the waveform
-            samples.
+            samples. The samples are uploaded with single precision.
         clear_existing: Specify whether to clear the waveform memory before the
             present upload.
+        smart_clear: Skip clearing the waveform memory if every slot is
+            overwritten by the present upload anyway.
+
+            .. versionadded:: 0.5
     """
-    generator_path = f"/{device_id}/qachannels/{channel_index}/generator/"
+    write_to_waveform_memory_multi(
+        daq,
+        device_id,
+        {channel_index: waveforms},
+        clear_existing=clear_existing,
+        smart_clear=smart_clear,
+    )
 
-    if clear_existing:
-        daq.syncSetInt(generator_path + "clearwave", 1)
+
+def write_to_waveform_memory_multi(
+    daq: ziDAQServer,
+    device_id: str,
+    waveforms: t.Dict[int, dict],
+    *,
+    clear_existing: bool = True,
+    smart_clear: bool = True,
+) -> None:
+    """Writes pulses to the waveform memories of multiple generators.
+
+    All waveforms are uploaded with a single transaction, which is
+    considerably faster than calling write_to_waveform_memory once per
+    channel.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQA device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        waveforms: Dictionary of waveforms per generator, the key specifies the
+            channel index and the value the waveforms for that generator in the
+            same format as for write_to_waveform_memory.
+        clear_existing: Specify whether to clear the waveform memory of the
+            affected generators before the present upload.
+        smart_clear: Skip clearing the waveform memory of a generator if every
+            slot is overwritten by the present upload anyway. The number of
+            slots is only queried once per API session and device.
+
+    .. versionadded:: 0.5
+    """
+    all_slots = None
+    if clear_existing and smart_clear:
+        key = (_session_key(daq), device_id.lower())
+        num_slots = _NUM_WAVEFORMS_CACHE.get(key)
+        if num_slots is None:
+            num_slots = len(
+                daq.listNodes(f"/{device_id}/qachannels/0/generator/waveforms")
+            )
+            _NUM_WAVEFORMS_CACHE[key] = num_slots
+        all_slots = set(range(num_slots))
 
     settings = []
-    for slot, waveform in waveforms.items():
-        settings.append((generator_path + f"waveforms/{slot}/wave", waveform))
+    # Waveforms used for multiple slots are only converted once. The ids stay
+    # unique since the waveforms are referenced by the argument.
+    converted = {}
+    for channel_index, channel_waveforms in waveforms.items():
+        generator_path = _node_path(_GENERATOR_PATH, device_id, channel_index)
+        if clear_existing and set(channel_waveforms.keys()) != all_slots:
+            daq.syncSetInt(generator_path + "clearwave", 1)
+        for slot, waveform in channel_waveforms.items():
+            wave = converted.get(id(waveform))
+            if wave is None:
+                wave = np.ascontiguousarray(waveform, dtype=_WAVE_DTYPE)
+                converted[id(waveform)] = wave
+            settings.append((generator_path + f"waveforms/{slot}/wave", wave))
 
     daq.set(settings)
 
 
 def start_continuous_sw_trigger(
-    daq: ziDAQServer, device_id: str, *, num_triggers: int, wait_time: float
+    daq: ziDAQServer,
+    device_id: str,
+    *,
+    num_triggers: int,
+    wait_time: float,
+    sync_each_trigger: bool = False,
 ) -> None:
     """Issues a specified number of software triggers.
 
@@ -284,15 +628,34 @@ def start_continuous_sw_trigger(
             be connected to this instance.
         device_id: SHFQA device identifier, e.g. `dev12004` or 'shf-dev12004'.
         num_triggers: Number of triggers to be issued.
-        wait_time: Time between triggers in seconds.
+        wait_time: Time between triggers in seconds. The time needed to issue
+            a trigger is included in the wait time.
+        sync_each_trigger: Flag if every single trigger should be acknowledged
+            by the device before waiting for the next one. By default the
+            triggers are issued without blocking and acknowledged all at once
+            after the last trigger.
+
+            .. versionadded:: 0.5
     """
     min_wait_time = 0.02
     wait_time = max(min_wait_time, wait_time)
-    for _ in range(num_triggers):
-        # syncSetInt() is a blocking call with non-deterministic execution time that
-        # imposes a minimum time between two software triggers.
-        daq.syncSetInt(f"/{device_id}/system/swtriggers/0/single", 1)
-        time.sleep(wait_time)
+    trigger_path = f"/{device_id}/system/swtriggers/0/single"
+    # The triggers are scheduled relative to the start, so that the time spent
+    # issuing them does not accumulate over many triggers.
+    start_time = time.monotonic()
+    for i in range(1, num_triggers + 1):
+        if sync_each_trigger:
+            # syncSetInt() is a blocking call with non-deterministic execution time
+            # that imposes a minimum time between two software triggers.
+            daq.syncSetInt(trigger_path, 1)
+        else:
+            daq.setInt(trigger_path, 1)
+        remaining_time = start_time + i * wait_time - time.monotonic()
+        if remaining_time > 0:
+            time.sleep(remaining_time)
+    if not sync_each_trigger:
+        # Ensure all issued triggers have been processed by the device.
+        daq.sync()
 
 
 def enable_scope(
@@ -317,10 +680,9 @@ def enable_scope(
     daq.setInt(f"/{device_id}/scopes/0/single", single)
 
     path = f"/{device_id}/scopes/0/enable"
-    if daq.getInt(path) == 1 and daq.syncSetInt(path, 0) != 0:
-        raise RuntimeError(
-            f"Failed to disable the scope for device {device_id} before enabling it."
-        )
+    # Reset the scope in case it is still running. The disable is queued and
+    # acknowledged together with the following enable.
+    daq.setInt(path, 0)
     if daq.syncSetInt(path, 1) != 1:
         raise RuntimeError(f"The scope for device {device_id} could not be enabled")
 
@@ -345,26 +707,41 @@ def get_configure_weighted_integration_settings(
             details.
         weights: Dictionary containing the complex weight vectors, where keys
             correspond to the indices of the integration units to be configured.
+            The weights are uploaded with single precision.
         integration_delay: Delay in seconds before starting readout.
         integration_length: Number of samples over which the weighted integration
             runs. If set to None, the integration length is determined by the
-            length of the first weights vector.
+            length of the weights vectors, which must all have the same length.
         clear_existing: Specify whether to set all the integration weights to
             zero before proceeding with the present upload.
+
+    Raises:
+        ValueError: If integration_length is None and the weights vectors
+            differ in length.
     """
     assert len(weights) > 0, "'weights' cannot be empty."
 
-    integration_path = f"/{device_id}/qachannels/{channel_index}/readout/integration/"
+    if integration_length is None:
+        lengths = {len(weight) for weight in weights.values()}
+        if len(lengths) != 1:
+            raise ValueError(
+                "The integration length is ambiguous since the weights vectors "
+                f"differ in length {sorted(lengths)}. Please specify "
+                "integration_length explicitly."
+            )
+        integration_length = lengths.pop()
+
+    integration_path = _node_path(_INTEGRATION_PATH, device_id, channel_index)
 
     settings = []
     if clear_existing:
         settings.append((integration_path + "clearweight", 1))
 
-    for integration_unit, weight in weights.items():
+    # The weights are set in the order of the integration units.
+    for integration_unit, weight in sorted(weights.items(), key=lambda x: x[0]):
+        weight = np.ascontiguousarray(weight, dtype=_WAVE_DTYPE)
         settings.append((integration_path + f"weights/{integration_unit}/wave", weight))
 
-    if integration_length is None:
-        integration_length = len(next(iter(weights.values())))
     settings.append((integration_path + "length", integration_length))
     settings.append((integration_path + "delay", integration_delay))
 
@@ -375,7 +752,7 @@ configure_weighted_integration = configure_maker(
     get_configure_weighted_integration_settings,
     partial(
         build_docstring_configure,
-        "Configures the weighted integration on a specified channel.",
+        new_first_line="Configures the weighted integration on a specified channel.",
     ),
 )
 
@@ -405,7 +782,7 @@ def get_result_logger_for_spectroscopy_settings(
         averaging_mode: Select the averaging order of the result, with
             0 = cyclic and 1 = sequential.
     """
-    result_path = f"/{device_id}/qachannels/{channel_index}/spectroscopy/result/"
+    result_path = _node_path(_RESULT_PATH, device_id, channel_index, "spectroscopy")
     settings = [
         (result_path + "length", result_length),
         (result_path + "averages", num_averages),
@@ -419,7 +796,7 @@ configure_result_logger_for_spectroscopy = configure_maker(
     get_result_logger_for_spectroscopy_settings,
     partial(
         build_docstring_configure,
-        "Configures a specified result logger for " "spectroscopy mode.",
+        new_first_line="Configures a specified result logger for spectroscopy mode.",
     ),
 )
 
@@ -452,7 +829,7 @@ def get_result_logger_for_readout_settings(
         averaging_mode: Select the averaging order of the result, with
             0 = cyclic and 1 = sequential.
     """
-    result_path = f"/{device_id}/qachannels/{channel_index}/readout/result/"
+    result_path = _node_path(_RESULT_PATH, device_id, channel_index, "readout")
     settings = [
         (result_path + "length", result_length),
         (result_path + "averages", num_averages),
@@ -467,7 +844,7 @@ configure_result_logger_for_readout = configure_maker(
     get_result_logger_for_readout_settings,
     partial(
         build_docstring_configure,
-        "Configures a specified result logger for " "readout mode.",
+        new_first_line="Configures a specified result logger for readout mode.",
     ),
 )
 
@@ -477,7 +854,7 @@ def enable_result_logger(
     device_id: str,
     channel_index: int,
     *,
-    mode: str,
+    mode: t.Union[str, Mode],
     acknowledge_timeout: float = 1.0,
 ) -> None:
     """Resets and enables a specified result logger.
@@ -493,16 +870,22 @@ def enable_result_logger(
         channel_index: Index specifying which result logger to enable - there is
             one result logger per channel.
         mode: Select between "spectroscopy" and "readout" mode.
+
+            .. versionchanged:: 0.5
+
+                Also accepts a Mode and raises a ValueError for other values.
         acknowledge_timeout: Maximum time to wait for diverse acknowledgments in
             the implementation.
 
             .. versionadded:: 0.1.1
     """
-    enable_path = f"/{device_id}/qachannels/{channel_index}/{mode}/result/enable"
+    mode = _mode_name(mode)
+    result_path = _node_path(_RESULT_PATH, device_id, channel_index, mode)
+    enable_path = result_path + "enable"
 
-    # reset the result logger if some old measurement is still running
-    if daq.getInt(enable_path) == 1 and daq.syncSetInt(enable_path, 0) != 0:
-        raise RuntimeError(f"Failed to disable the result logger for {mode} mode.")
+    # reset the result logger if some old measurement is still running, the
+    # disable is queued and acknowledged together with the following enable
+    daq.setInt(enable_path, 0)
 
     # enable the result logger
     if daq.syncSetInt(enable_path, 1) != 1:
@@ -517,7 +900,7 @@ def get_result_logger_data(
     device_id: str,
     channel_index: int,
     *,
-    mode: str,
+    mode: t.Union[str, Mode],
     timeout: float = 1.0,
 ) -> np.array:
     """Return the measured data of a specified result logger.
@@ -532,32 +915,39 @@ def get_result_logger_data(
         channel_index: Index specifying which result logger to query results
             from - there is one result logger per channel.
         mode: Select between "spectroscopy" and "readout" mode.
+
+            .. versionchanged:: 0.5
+
+                Also accepts a Mode and raises a ValueError for other values.
         timeout: Maximum time to wait for data in seconds.
 
     Returns:
         Array containing the result logger data.
     """
+    mode = _mode_name(mode)
+    result_path = _node_path(_RESULT_PATH, device_id, channel_index, mode)
     try:
-        wait_for_state_change(
-            daq,
-            f"/{device_id}/qachannels/{channel_index}/{mode}/result/enable",
-            0,
-            timeout=timeout,
-        )
+        wait_for_state_change(daq, result_path + "enable", 0, timeout=timeout)
     except TimeoutError as error:
         raise TimeoutError(
             "The result logger is still running. "
-            "This usually indicates that it did not receive the expected number of "
-            "triggers."
+            "This usually indicates that it did not receive the expected number "
+            "of triggers."
         ) from error
 
     data = daq.get(
-        f"/{device_id}/qachannels/{channel_index}/{mode}/result/data/*/wave",
+        result_path + "data/*/wave",
         flat=True,
     )
 
-    result = np.array([d[0]["vector"] for d in data.values()])
-    return result
+    vectors = [d[0]["vector"] for d in data.values()]
+    if not vectors:
+        return np.array(vectors)
+    if len(vectors) == 1:
+        # A single vector is returned as a view on the received data.
+        return np.asarray(vectors[0])[np.newaxis]
+    # np.stack copies the vectors directly into a single preallocated array.
+    return np.stack(vectors)
 
 
 def get_channel_settings(
@@ -628,15 +1018,10 @@ def get_sequencer_triggering_settings(
             daq.help(f"/{device_id}/qachannels/0/generator/auxtriggers/0/channel")
         play_pulse_delay: Delay in seconds before the start of waveform playback.
     """
+    generator_path = _node_path(_GENERATOR_PATH, device_id, channel_index)
     settings = [
-        (
-            f"/{device_id}/qachannels/{channel_index}/generator/auxtriggers/0/channel",
-            aux_trigger,
-        ),
-        (
-            f"/{device_id}/qachannels/{channel_index}/generator/delay",
-            play_pulse_delay,
-        ),
+        (generator_path + "auxtriggers/0/channel", aux_trigger),
+        (generator_path + "delay", play_pulse_delay),
     ]
 
     return settings
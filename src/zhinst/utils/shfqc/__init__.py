@@ -5,10 +5,13 @@ from zhinst.utils.shfqa import multistate
 __all__ = [
     "max_qubits_per_qa_channel",
     "load_sequencer_program",
+    "load_sequencer_program_async",
     "enable_sequencer",
     "write_to_waveform_memory",
+    "write_to_waveform_memory_multi",
     "configure_scope",
     "get_scope_data",
+    "get_scope_data_async",
     "start_continuous_sw_trigger",
     "enable_scope",
     "configure_weighted_integration",
@@ -21,6 +24,9 @@ __all__ = [
     "upload_commandtable",
     "configure_marker_and_trigger",
     "configure_sg_channel",
+    "configure_sg_channel_full",
+    "configure_sg_channels",
+    "configure_channels",
     "configure_pulse_modulation",
     "configure_sine_generation",
     "multistate",
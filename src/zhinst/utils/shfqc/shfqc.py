@@ -1,8 +1,13 @@
 """Zurich Instruments LabOne Python API Utility functions for SHFQC."""
+import typing as t
+
 import numpy as np
 from zhinst.core import AwgModule, ziDAQServer
 
 from zhinst.utils import shfqa, shfsg
+from zhinst.utils.auto_generate_functions import batched_config
+
+_BAD_CHANNEL = 'channel_type was set to {!r} but only "qa" and "sg" are allowed'.format
 
 
 def max_qubits_per_qa_channel(daq: ziDAQServer, device_id: str) -> int:
@@ -13,6 +18,11 @@ def max_qubits_per_qa_channel(daq: ziDAQServer, device_id: str) -> int:
             Server. The device with identifier device_id is assumed to already
             be connected to this instance.
         device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
+
+    .. versionchanged:: 0.5
+
+        The value is only queried once per API session and device. Use
+        :func:`zhinst.utils.clear_device_feature_cache` to reset it.
     """
     return shfqa.max_qubits_per_channel(daq, device_id)
 
@@ -26,6 +36,7 @@ def load_sequencer_program(
     channel_type: str,
     awg_module: AwgModule = None,
     timeout: float = 10,
+    skip_unchanged: bool = False,
 ) -> None:
     """Compiles and loads a program to a specified sequencer.
 
@@ -43,6 +54,14 @@ def load_sequencer_program(
         awg_module: The standalone AWG compiler is used instead. .. deprecated:: 22.08
         timeout: Maximum time to wait for the compilation on the device in
             seconds.
+        skip_unchanged: Skip the upload if the compiled program is identical
+            to the last one loaded to the sequencer with this API session.
+            The compiled program is also reused if the same sequencer program
+            was already compiled for the same device and channel. Changes to
+            waveform files or includes referenced by the program are not
+            detected, see :func:`zhinst.utils.clear_upload_cache`.
+
+            .. versionadded:: 0.5
     """
     if channel_type == "qa":
         return shfqa.load_sequencer_program(
@@ -52,6 +71,7 @@ def load_sequencer_program(
             sequencer_program,
             awg_module=awg_module,
             timeout=timeout,
+            skip_unchanged=skip_unchanged,
         )
     if channel_type == "sg":
         return shfsg.load_sequencer_program(
@@ -61,10 +81,79 @@ def load_sequencer_program(
             sequencer_program,
             awg_module=awg_module,
             timeout=timeout,
+            skip_unchanged=skip_unchanged,
         )
-    raise ValueError(
-        f'channel_type was set to {channel_type} but only qa" and "sg" ' "are allowed"
-    )
+    raise ValueError(_BAD_CHANNEL(channel_type))
+
+
+async def load_sequencer_program_async(
+    daq: ziDAQServer,
+    device_id: str,
+    channel_index: int,
+    sequencer_program: str,
+    *,
+    channel_type: str,
+    timeout: float = 10,
+    skip_unchanged: bool = False,
+) -> None:
+    """Compiles and loads a program to a specified sequencer without blocking.
+
+    Same as load_sequencer_program but runs it, including the wait for the
+    sequencer to be ready, in the default executor of the running event loop.
+    Compiling and uploading can therefore overlap with other tasks.
+
+    Warning:
+        The API session is used from the executor thread for the whole
+        duration of the upload. Since an API session must not be used from
+        several threads at once, uploads that run concurrently need separate
+        API sessions, and the session must not be used by other code until
+        the returned coroutine finished.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        channel_index: Index specifying to which sequencer the program below is
+            uploaded - there is one sequencer per channel. (Always 0 for the
+            qa channel)
+        sequencer_program: Sequencer program to be uploaded.
+        channel_type: Identifier specifying if the sequencer from the qa or sg
+            channel should be used. ("qa" or "sg")
+        timeout: Maximum time to wait for the sequencer to be ready after the
+            upload in seconds.
+        skip_unchanged: Skip the upload if the compiled program is identical
+            to the last one loaded to the sequencer with this API session.
+            The compiled program is also reused if the same sequencer program
+            was already compiled for the same device and channel. Changes to
+            waveform files or includes referenced by the program are not
+            detected, see :func:`zhinst.utils.clear_upload_cache`.
+
+    Raises:
+        RuntimeError: If the Upload was not successfully or the device could not
+            process the sequencer program.
+
+    .. versionadded:: 0.5
+    """
+    if channel_type == "qa":
+        return await shfqa.load_sequencer_program_async(
+            daq,
+            device_id,
+            0,
+            sequencer_program,
+            timeout=timeout,
+            skip_unchanged=skip_unchanged,
+        )
+    if channel_type == "sg":
+        return await shfsg.load_sequencer_program_async(
+            daq,
+            device_id,
+            channel_index,
+            sequencer_program,
+            timeout=timeout,
+            skip_unchanged=skip_unchanged,
+        )
+    raise ValueError(_BAD_CHANNEL(channel_type))
 
 
 def enable_sequencer(
@@ -88,6 +177,9 @@ def enable_sequencer(
                 0 - Restart sequencer after finishing execution.
         channel_type: Identifier specifying if the sequencer from the qa or sg
             channel should be used. ("qa" or "sg")
+
+    Raises:
+        RuntimeError: If the sequencer could not be enabled.
     """
     if channel_type == "qa":
         return shfqa.enable_sequencer(
@@ -103,9 +195,7 @@ def enable_sequencer(
             channel_index,
             single=single,
         )
-    raise ValueError(
-        f'channel_type was set to {channel_type} but only "qa" and "sg" ' "are allowed"
-    )
+    raise ValueError(_BAD_CHANNEL(channel_type))
 
 
 def write_to_waveform_memory(
@@ -116,6 +206,7 @@ def write_to_waveform_memory(
     *,
     channel_type: str,
     clear_existing: bool = True,
+    smart_clear: bool = True,
 ) -> None:
     """Writes pulses to the waveform memory of a specified generator.
 
@@ -133,6 +224,11 @@ def write_to_waveform_memory(
             to the qa or sg channel. ("qa" or "sg")
         clear_existing: Specify whether to clear the waveform memory before the
             present upload. (Only used when channel_type is "qa"!)
+        smart_clear: Skip clearing the waveform memory if every slot is
+            overwritten by the present upload anyway. (Only used when
+            channel_type is "qa"!)
+
+            .. versionadded:: 0.5
     """
     if channel_type == "qa":
         return shfqa.write_to_waveform_memory(
@@ -141,12 +237,57 @@ def write_to_waveform_memory(
             channel_index,
             waveforms,
             clear_existing=clear_existing,
+            smart_clear=smart_clear,
         )
     if channel_type == "sg":
         return shfsg.write_to_waveform_memory(daq, device_id, channel_index, waveforms)
-    raise ValueError(
-        f'channel_type was set to {channel_type} but only "qa" and "sg" are allowed'
-    )
+    raise ValueError(_BAD_CHANNEL(channel_type))
+
+
+def write_to_waveform_memory_multi(
+    daq: ziDAQServer,
+    device_id: str,
+    waveforms: t.Dict[int, dict],
+    *,
+    channel_type: str,
+    clear_existing: bool = True,
+    smart_clear: bool = True,
+) -> None:
+    """Writes pulses to the waveform memories of multiple generators.
+
+    All waveforms are uploaded with a single transaction, which is
+    considerably faster than calling write_to_waveform_memory once per
+    channel.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        waveforms: Dictionary of waveforms per generator, the key specifies the
+            channel index and the value the waveforms for that generator in the
+            same format as for write_to_waveform_memory.
+        channel_type: Identifier specifying if the waveforms should be uploaded
+            to the qa or sg channels. ("qa" or "sg")
+        clear_existing: Specify whether to clear the waveform memory before the
+            present upload. (Only used when channel_type is "qa"!)
+        smart_clear: Skip clearing the waveform memory if every slot is
+            overwritten by the present upload anyway. (Only used when
+            channel_type is "qa"!)
+
+    .. versionadded:: 0.5
+    """
+    if channel_type == "qa":
+        return shfqa.write_to_waveform_memory_multi(
+            daq,
+            device_id,
+            waveforms,
+            clear_existing=clear_existing,
+            smart_clear=smart_clear,
+        )
+    if channel_type == "sg":
+        return shfsg.write_to_waveform_memory_multi(daq, device_id, waveforms)
+    raise ValueError(_BAD_CHANNEL(channel_type))
 
 
 def configure_scope(
@@ -195,7 +336,14 @@ def configure_scope(
     )
 
 
-def get_scope_data(daq: ziDAQServer, device_id: str, *, timeout: float = 5.0) -> tuple:
+def get_scope_data(
+    daq: ziDAQServer,
+    device_id: str,
+    *,
+    timeout: float = 5.0,
+    to_volts: bool = False,
+    wait: bool = True,
+) -> "shfqa.ScopeData":
     """Queries the scope for data once it is finished.
 
     Args:
@@ -204,21 +352,70 @@ def get_scope_data(daq: ziDAQServer, device_id: str, *, timeout: float = 5.0) ->
             be connected to this instance.
         device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
         timeout: Maximum time to wait for the scope data in seconds.
+        to_volts: Flag if the recorded data should be scaled to volts. The
+            scaling is done in-place on the received data.
+
+            .. versionadded:: 0.5
+
+        wait: Flag if the function should wait until the scope has finished
+            recording. Can be disabled if this is already known, e.g. after
+            waiting for the scope in a separate step.
+
+            .. versionadded:: 0.5
 
     Returns:
-        Three-element tuple with:
+        Three-element named tuple (see shfqa.ScopeData) with:
             * recorded_data (array): Contains an array per scope channel with
                 the recorded data.
             * recorded_data_range (array): Full scale range of each scope
                 channel.
             * scope_time (array): Relative acquisition time for each point in
                 recorded_data in seconds starting from 0.
+
+    .. versionchanged:: 0.5
+
+        Returns a ScopeData named tuple and the full scale ranges as one array.
     """
-    return shfqa.get_scope_data(daq, device_id, timeout=timeout)
+    return shfqa.get_scope_data(
+        daq, device_id, timeout=timeout, to_volts=to_volts, wait=wait
+    )
+
+
+def get_scope_data_async(
+    daq: ziDAQServer, device_id: str, *, timeout: float = 5.0, to_volts: bool = False
+) -> t.Awaitable["shfqa.ScopeData"]:
+    """Queries the scope for data once it is finished without blocking.
+
+    Same as get_scope_data but yields to the asyncio event loop while waiting
+    for the scope, so that e.g. the scopes of multiple devices can be awaited
+    concurrently.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        timeout: Maximum time to wait for the scope data in seconds.
+        to_volts: Flag if the recorded data should be scaled to volts. The
+            scaling is done in-place on the received data.
+
+    Returns:
+        Awaitable for the recorded data, see get_scope_data.
+
+    .. versionadded:: 0.5
+    """
+    return shfqa.get_scope_data_async(
+        daq, device_id, timeout=timeout, to_volts=to_volts
+    )
 
 
 def start_continuous_sw_trigger(
-    daq: ziDAQServer, device_id: str, *, num_triggers: int, wait_time: float
+    daq: ziDAQServer,
+    device_id: str,
+    *,
+    num_triggers: int,
+    wait_time: float,
+    sync_each_trigger: bool = False,
 ) -> None:
     """Start a continuous trigger.
 
@@ -238,9 +435,19 @@ def start_continuous_sw_trigger(
         device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
         num_triggers: Number of triggers to be issued.
         wait_time: Time between triggers in seconds.
+        sync_each_trigger: Flag if every single trigger should be acknowledged
+            by the device before waiting for the next one. By default the
+            triggers are issued without blocking and acknowledged all at once
+            after the last trigger.
+
+            .. versionadded:: 0.5
     """
     return shfqa.start_continuous_sw_trigger(
-        daq, device_id, num_triggers=num_triggers, wait_time=wait_time
+        daq,
+        device_id,
+        num_triggers=num_triggers,
+        wait_time=wait_time,
+        sync_each_trigger=sync_each_trigger,
     )
 
 
@@ -273,6 +480,7 @@ def configure_weighted_integration(
     *,
     weights: dict,
     integration_delay: float = 0.0,
+    integration_length: t.Optional[int] = None,
     clear_existing: bool = True,
 ) -> None:
     """Configures the weighted integration on a specified channel.
@@ -285,8 +493,17 @@ def configure_weighted_integration(
         weights: Dictionary containing the complex weight vectors, where keys
             correspond to the indices of the integration units to be configured.
         integration_delay: Delay in seconds before starting readout.
+        integration_length: Number of samples over which the weighted integration
+            runs. If set to None, the integration length is determined by the
+            length of the weights vectors, which must all have the same length.
+
+            .. versionadded:: 0.5
         clear_existing: Specify whether to set all the integration weights to
             zero before proceeding with the present upload.
+
+    Raises:
+        ValueError: If integration_length is None and the weights vectors
+            differ in length.
     """
     return shfqa.configure_weighted_integration(
         daq,
@@ -294,6 +511,7 @@ def configure_weighted_integration(
         0,
         weights=weights,
         integration_delay=integration_delay,
+        integration_length=integration_length,
         clear_existing=clear_existing,
     )
 
@@ -363,7 +581,11 @@ def configure_result_logger_for_readout(
 
 
 def enable_result_logger(
-    daq: ziDAQServer, device_id: str, *, mode: str, acknowledge_timeout: float = 1.0
+    daq: ziDAQServer,
+    device_id: str,
+    *,
+    mode: t.Union[str, shfqa.Mode],
+    acknowledge_timeout: float = 1.0,
 ) -> None:
     """Resets and enables a specified result logger.
 
@@ -375,6 +597,11 @@ def enable_result_logger(
             be connected to this instance.
         device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
         mode: Select between "spectroscopy" and "readout" mode.
+
+            .. versionchanged:: 0.5
+
+                Also accepts a shfqa.Mode and raises a ValueError for other
+                values.
         acknowledge_timeout: Maximum time to wait for diverse acknowledgments
             in the implementation.
 
@@ -389,7 +616,7 @@ def get_result_logger_data(
     daq: ziDAQServer,
     device_id: str,
     *,
-    mode: str,
+    mode: t.Union[str, shfqa.Mode],
     timeout: float = 1.0,
 ) -> np.array:
     """Return the measured data of a specified result logger.
@@ -402,6 +629,11 @@ def get_result_logger_data(
             be connected to this instance.
         device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
         mode: Select between "spectroscopy" and "readout" mode.
+
+            .. versionchanged:: 0.5
+
+                Also accepts a shfqa.Mode and raises a ValueError for other
+                values.
         timeout: Maximum time to wait for data in seconds.
 
     Returns:
@@ -475,6 +707,8 @@ def upload_commandtable(
     device_id: str,
     channel_index: int,
     command_table: str,
+    *,
+    skip_unchanged: bool = False,
 ) -> None:
     """Uploads a command table in the form of a string to the appropriate channel.
 
@@ -486,8 +720,16 @@ def upload_commandtable(
         channel_index: Index specifying which SG channel to upload the command
             table to.
         command_table: The command table to be uploaded.
+        skip_unchanged: Skip the upload if the same command table was the last
+            one uploaded to the channel with this API session. Loading a
+            sequencer program to the channel resets this.
+            See :func:`zhinst.utils.clear_upload_cache`.
+
+            .. versionadded:: 0.5
     """
-    return shfsg.upload_commandtable(daq, device_id, channel_index, command_table)
+    return shfsg.upload_commandtable(
+        daq, device_id, channel_index, command_table, skip_unchanged=skip_unchanged
+    )
 
 
 def configure_marker_and_trigger(
@@ -561,6 +803,122 @@ def configure_sg_channel(
     )
 
 
+def configure_sg_channel_full(
+    daq: ziDAQServer,
+    device_id: str,
+    channel_index: int,
+    *,
+    channel: t.Optional[t.Dict[str, t.Any]] = None,
+    marker_and_trigger: t.Optional[t.Dict[str, t.Any]] = None,
+    pulse_modulation: t.Optional[t.Dict[str, t.Any]] = None,
+    sine_generation: t.Optional[t.Dict[str, t.Any]] = None,
+) -> None:
+    """Configures multiple aspects of a specified SG channel at once.
+
+    The settings are applied in a single transaction instead of one per
+    configure function.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        channel_index: Index of the used SG channel.
+        channel: Keyword arguments for configure_sg_channel. If None, the RF
+            input and output are not configured.
+        marker_and_trigger: Keyword arguments for configure_marker_and_trigger.
+            If None, the trigger inputs and marker outputs are not configured.
+        pulse_modulation: Keyword arguments for configure_pulse_modulation. If
+            None, the pulse modulation is not configured.
+        sine_generation: Keyword arguments for configure_sine_generation. If
+            None, the sine generator output is not configured.
+
+    .. versionadded:: 0.5
+    """
+    return shfsg.configure_channel_full(
+        daq,
+        device_id,
+        channel_index,
+        channel=channel,
+        marker_and_trigger=marker_and_trigger,
+        pulse_modulation=pulse_modulation,
+        sine_generation=sine_generation,
+    )
+
+
+def configure_sg_channels(
+    daq: ziDAQServer,
+    device_id: str,
+    channel_indices: t.Iterable[int],
+    *,
+    channel: t.Optional[t.Dict[str, t.Any]] = None,
+    marker_and_trigger: t.Optional[t.Dict[str, t.Any]] = None,
+    pulse_modulation: t.Optional[t.Dict[str, t.Any]] = None,
+    sine_generation: t.Optional[t.Dict[str, t.Any]] = None,
+) -> None:
+    """Configures multiple SG channels identically at once.
+
+    The settings of all channels are applied in a single transaction instead
+    of one per channel and configure function.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        channel_indices: Indices of the SG channels to configure.
+        channel: Keyword arguments for configure_sg_channel. If None, the RF
+            input and output are not configured.
+        marker_and_trigger: Keyword arguments for configure_marker_and_trigger.
+            If None, the trigger inputs and marker outputs are not configured.
+        pulse_modulation: Keyword arguments for configure_pulse_modulation. If
+            None, the pulse modulation is not configured.
+        sine_generation: Keyword arguments for configure_sine_generation. If
+            None, the sine generator output is not configured.
+
+    .. versionadded:: 0.5
+    """
+    return shfsg.configure_channels(
+        daq,
+        device_id,
+        channel_indices,
+        channel=channel,
+        marker_and_trigger=marker_and_trigger,
+        pulse_modulation=pulse_modulation,
+        sine_generation=sine_generation,
+    )
+
+
+def configure_channels(
+    daq: ziDAQServer,
+    device_id: str,
+    *,
+    qa_channel: t.Optional[t.Dict[str, t.Any]] = None,
+    sg_channels: t.Optional[t.Dict[int, t.Dict[str, t.Any]]] = None,
+) -> None:
+    """Configures the RF inputs and outputs of multiple channels at once.
+
+    The settings of all channels are applied in a single transaction.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFQC device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        qa_channel: Keyword arguments for configure_qa_channel. If None, the
+            qa channel is not configured.
+        sg_channels: Keyword arguments for configure_sg_channel, the key
+            specifies the index of the SG channel.
+
+    .. versionadded:: 0.5
+    """
+    with batched_config(daq):
+        if qa_channel is not None:
+            configure_qa_channel(daq, device_id, **qa_channel)
+        for channel_index, channel_settings in (sg_channels or {}).items():
+            configure_sg_channel(daq, device_id, channel_index, **channel_settings)
+
+
 def configure_pulse_modulation(
     daq: ziDAQServer,
     device_id: str,
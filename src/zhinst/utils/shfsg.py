@@ -1,32 +1,86 @@
 """Zurich Instruments LabOne Python API Utility functions for SHFSG."""
+import asyncio
 import typing as t
-from functools import partial
+from functools import lru_cache, partial
 
 from zhinst.utils import convert_awg_waveform
+from zhinst.utils.utils import (
+    _DEVICE_CACHES,
+    _compile_seqc,
+    _is_uploaded,
+    _session_key,
+    _set_uploaded,
+    _upload_digest,
+    get_device_features,
+    wait_for_state_change,
+)
 from zhinst.utils.auto_generate_functions import (
+    _apply_settings,
+    batched_config,
     configure_maker,
     build_docstring_configure,
 )
-from zhinst.core import ziDAQServer, compile_seqc
+from zhinst.core import ziDAQServer
 
 SHFSG_MAX_SIGNAL_GENERATOR_WAVEFORM_LENGTH = 98304
 SHFSG_SAMPLING_FREQUENCY = 2e9
 
 
+@lru_cache(maxsize=256)
+def _channel_paths(device_id: str, channel_index: int) -> t.Dict[str, str]:
+    """Returns the full paths of the static nodes of an SG channel."""
+    channel_path = f"/{device_id}/sgchannels/{channel_index}/"
+    nodes = (
+        "awg/auxtriggers/0/channel",
+        "awg/auxtriggers/0/slope",
+        "awg/commandtable/data",
+        "awg/elf/data",
+        "awg/enable",
+        "awg/modulation/enable",
+        "awg/outputamplitude",
+        "awg/outputs/0/gains/0",
+        "awg/outputs/0/gains/1",
+        "awg/outputs/1/gains/0",
+        "awg/outputs/1/gains/1",
+        "awg/ready",
+        "awg/reset",
+        "awg/single",
+        "awg/waveform/waves/",
+        "digitalmixer/centerfreq",
+        "marker/source",
+        "output/on",
+        "output/range",
+        "output/rflfpath",
+        "synthesizer",
+    )
+    paths = {node: channel_path + node for node in nodes}
+    # The channel itself, for nodes with a variable index such as oscs/*/freq.
+    paths[""] = channel_path
+    return paths
+
+
+# Synthesizer per (API session, device, channel), see configure_channel().
+_SYNTHESIZER_CACHE: t.Dict[t.Tuple[int, str, int], int] = {}
+_DEVICE_CACHES.append(_SYNTHESIZER_CACHE)
+
+
 def load_sequencer_program(
     daq: ziDAQServer,
     device_id: str,
     channel_index: int,
     sequencer_program: str,
+    *,
+    timeout: float = 10,
+    skip_unchanged: bool = False,
     **_,
 ) -> None:
     """Compiles and loads a program to a specified AWG core.
 
-    This function is composed of 4 steps:
-        1. Reset the awg core to ensure a clean state.
-        2. Compile the sequencer program with the offline compiler.
-        3. Upload the compiled binary elf file.
-        4. Validate that the upload was successful and the awg core is ready
+    This function is composed of 3 steps:
+        1. Compile the sequencer program with the offline compiler.
+        2. Reset the awg core and upload the compiled binary elf file in a
+           single transaction.
+        3. Validate that the upload was successful and the awg core is ready
            again.
 
     Args:
@@ -37,23 +91,111 @@ def load_sequencer_program(
         channel_index: Index specifying which sequencer to upload - there
             is one sequencer per channel.
         sequencer_program: Sequencer program to be uploaded.
+        timeout: Maximum time to wait for the awg core to be ready after the
+            upload in seconds.
+
+            .. versionadded:: 0.5
+        skip_unchanged: Skip the upload if the compiled program is identical
+            to the last one loaded to the AWG core with this API session.
+            The compiled program is also reused if the same sequencer program
+            was already compiled for the same device and channel. Changes to
+            waveform files or includes referenced by the program are not
+            detected, see :func:`zhinst.utils.clear_upload_cache`.
+
+            .. versionadded:: 0.5
 
     Raises:
         RuntimeError: If the Upload was not successfully or the device could not
             process the sequencer program.
     """
-    # start by resetting the sequencer
-    daq.syncSetInt(f"/{device_id}/sgchannels/{channel_index}/awg/reset", 1)
-    device_type = daq.getString(f"/{device_id}/features/devtype")
-    device_options = daq.getString(f"/{device_id}/features/options")
-    elf, _ = compile_seqc(
-        sequencer_program, device_type, device_options, channel_index, sequencer="sg"
+    paths = _channel_paths(device_id, channel_index)
+    # Compile the sequencer program.
+    device_type, device_options = get_device_features(daq, device_id)
+    elf = _compile_seqc(
+        sequencer_program,
+        device_type,
+        device_options,
+        channel_index,
+        "sg",
+        cached=skip_unchanged,
     )
-    daq.setVector(f"/{device_id}/sgchannels/{channel_index}/awg/elf/data", elf)
-    if not daq.get(f"/{device_id}/sgchannels/{channel_index}/awg/ready"):
+    digest = _upload_digest(elf)
+    if skip_unchanged and _is_uploaded(daq, paths["awg/elf/data"], digest):
+        return
+    _set_uploaded(daq, paths["awg/elf/data"])
+    # The reset may also affect the command table.
+    _set_uploaded(daq, paths["awg/commandtable/data"])
+    # Reset the sequencer and upload the binary elf file to the device.
+    daq.set([(paths["awg/reset"], 1), (paths["awg/elf/data"], elf)])
+    daq.sync()
+    # Validate that the upload was successful and the awg core is ready again.
+    try:
+        wait_for_state_change(daq, paths["awg/ready"], 1, timeout=timeout)
+    except TimeoutError as error:
         raise RuntimeError(
             "The device did not not switch to into the ready state after the upload."
-        )
+        ) from error
+    _set_uploaded(daq, paths["awg/elf/data"], digest)
+
+
+async def load_sequencer_program_async(
+    daq: ziDAQServer,
+    device_id: str,
+    channel_index: int,
+    sequencer_program: str,
+    *,
+    timeout: float = 10,
+    skip_unchanged: bool = False,
+) -> None:
+    """Compiles and loads a program to a specified AWG core without blocking.
+
+    Same as load_sequencer_program but runs it, including the wait for the
+    sequencer to be ready, in the default executor of the running event loop.
+    Compiling and uploading can therefore overlap with other tasks.
+
+    Warning:
+        The API session is used from the executor thread for the whole
+        duration of the upload. Since an API session must not be used from
+        several threads at once, uploads that run concurrently need separate
+        API sessions, and the session must not be used by other code until
+        the returned coroutine finished.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFSG device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        channel_index: Index specifying which sequencer to upload - there
+            is one sequencer per channel.
+        sequencer_program: Sequencer program to be uploaded.
+        timeout: Maximum time to wait for the awg core to be ready after the
+            upload in seconds.
+        skip_unchanged: Skip the upload if the compiled program is identical
+            to the last one loaded to the AWG core with this API session.
+            The compiled program is also reused if the same sequencer program
+            was already compiled for the same device and channel. Changes to
+            waveform files or includes referenced by the program are not
+            detected, see :func:`zhinst.utils.clear_upload_cache`.
+
+    Raises:
+        RuntimeError: If the Upload was not successfully or the device could not
+            process the sequencer program.
+
+    .. versionadded:: 0.5
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        None,
+        partial(
+            load_sequencer_program,
+            daq,
+            device_id,
+            channel_index,
+            sequencer_program,
+            timeout=timeout,
+            skip_unchanged=skip_unchanged,
+        ),
+    )
 
 
 def enable_sequencer(
@@ -74,12 +216,12 @@ def enable_sequencer(
             is one sequencer per channel.
         single: Flag if the sequencer should run in single mode.
     """
-    sequencer_path = f"/{device_id}/sgchannels/{channel_index}/awg/"
+    paths = _channel_paths(device_id, channel_index)
     daq.setInt(
-        sequencer_path + "single",
+        paths["awg/single"],
         int(single),
     )
-    if not daq.syncSetInt(sequencer_path + "enable", 1):
+    if not daq.syncSetInt(paths["awg/enable"], 1):
         raise RuntimeError(
             "The sequencer could not be enabled. Please ensure that the "
             "sequencer program is loaded and configured correctly."
@@ -91,6 +233,8 @@ def upload_commandtable(
     device_id: str,
     channel_index: int,
     command_table: str,
+    *,
+    skip_unchanged: bool = False,
 ) -> None:
     """Uploads a command table in the form of a string to the appropriate channel.
 
@@ -102,12 +246,23 @@ def upload_commandtable(
         channel_index: Index specifying which channel to upload the command
             table to.
         command_table: The command table to be uploaded.
+        skip_unchanged: Skip the upload if the same command table was the last
+            one uploaded to the channel with this API session. Loading a
+            sequencer program to the channel resets this.
+            See :func:`zhinst.utils.clear_upload_cache`.
+
+            .. versionadded:: 0.5
     """
+    commandtable_path = _channel_paths(device_id, channel_index)[
+        "awg/commandtable/data"
+    ]
+    digest = _upload_digest(command_table)
+    if skip_unchanged and _is_uploaded(daq, commandtable_path, digest):
+        return
+    _set_uploaded(daq, commandtable_path)
     # upload command table
-    daq.setVector(
-        f"/{device_id}/sgchannels/{channel_index}/awg/commandtable/data",
-        command_table,
-    )
+    daq.setVector(commandtable_path, command_table)
+    _set_uploaded(daq, commandtable_path, digest)
 
 
 def write_to_waveform_memory(
@@ -128,12 +283,45 @@ def write_to_waveform_memory(
         waveforms (dict): Dictionary of waveforms, the key specifies the
             waveform index to which to write the waveforms.
     """
-    waveforms_path = f"/{device_id}/sgchannels/{channel_index}/awg/waveform/waves/"
-    settings = []
+    write_to_waveform_memory_multi(daq, device_id, {channel_index: waveforms})
 
-    for slot, waveform in waveforms.items():
-        wave_raw = convert_awg_waveform(waveform)
-        settings.append((waveforms_path + f"{slot}", wave_raw))
+
+def write_to_waveform_memory_multi(
+    daq: ziDAQServer,
+    device_id: str,
+    waveforms: t.Dict[int, dict],
+) -> None:
+    """Writes waveforms to the waveform memories of multiple sequencers.
+
+    All waveforms are uploaded with a single transaction, which is
+    considerably faster than calling write_to_waveform_memory once per
+    channel.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFSG device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        waveforms: Dictionary of waveforms per sequencer, the key specifies the
+            channel index and the value the waveforms for that sequencer in the
+            same format as for write_to_waveform_memory.
+
+    .. versionadded:: 0.5
+    """
+    settings = []
+    # Waveforms used for multiple slots are only converted once. The ids stay
+    # unique since the waveforms are referenced by the argument.
+    converted = {}
+    for channel_index, channel_waveforms in waveforms.items():
+        waveforms_path = _channel_paths(device_id, channel_index)[
+            "awg/waveform/waves/"
+        ]
+        for slot, waveform in channel_waveforms.items():
+            wave_raw = converted.get(id(waveform))
+            if wave_raw is None:
+                wave_raw = convert_awg_waveform(waveform)
+                converted[id(waveform)] = wave_raw
+            settings.append((waveforms_path + str(slot), wave_raw))
 
     daq.set(settings)
 
@@ -168,20 +356,12 @@ def get_marker_and_trigger_settings(
             daq.help(f"/{dev_id}/sgchannels/{channel_index}/marker/source")
             or `available_trigger_slopes` in zhinst.toolkit
     """
+    paths = _channel_paths(device_id, channel_index)
     # Trigger input
     settings = [
-        (
-            f"/{device_id}/sgchannels/{channel_index}/awg/auxtriggers/0/channel",
-            trigger_in_source,
-        ),
-        (
-            f"/{device_id}/sgchannels/{channel_index}/awg/auxtriggers/0/slope",
-            trigger_in_slope,
-        ),
-        (
-            f"/{device_id}/sgchannels/{channel_index}/marker/source",
-            marker_out_source,
-        ),
+        (paths["awg/auxtriggers/0/channel"], trigger_in_source),
+        (paths["awg/auxtriggers/0/slope"], trigger_in_slope),
+        (paths["marker/source"], marker_out_source),
     ]
 
     # Marker output
@@ -220,22 +400,33 @@ def configure_channel(
         output_range: Maximal range of the signal output power in dbM.
         center_frequency: Center Frequency before modulation.
         rflf_path: Switch between RF and LF paths.
-    """
-    path = f"/{device_id}/sgchannels/{channel_index}/"
-    settings = []
 
-    settings.append((path + "output/range", output_range))
-    settings.append((path + "output/rflfpath", rflf_path))
+    .. versionchanged:: 0.5
+
+        The synthesizer used by the channel in the RF path is only queried
+        once per API session. Use
+        :func:`zhinst.utils.clear_device_feature_cache` to reset it.
+    """
+    paths = _channel_paths(device_id, channel_index)
+    settings = [
+        (paths["output/range"], output_range),
+        (paths["output/rflfpath"], rflf_path),
+    ]
     if rflf_path == 1:
-        synth = daq.getInt(path + "synthesizer")
+        # The synthesizer of a channel is fixed by the hardware.
+        key = (_session_key(daq), device_id.lower(), channel_index)
+        synth = _SYNTHESIZER_CACHE.get(key)
+        if synth is None:
+            synth = daq.getInt(paths["synthesizer"])
+            _SYNTHESIZER_CACHE[key] = synth
         settings.append(
             (f"/{device_id}/synthesizers/{synth}/centerfreq", center_frequency)
         )
     elif rflf_path == 0:
-        settings.append((path + "digitalmixer/centerfreq", center_frequency))
-    settings.append((path + "output/on", enable))
+        settings.append((paths["digitalmixer/centerfreq"], center_frequency))
+    settings.append((paths["output/on"], enable))
 
-    daq.set(settings)
+    _apply_settings(daq, settings)
 
 
 def get_pulse_modulation_settings(
@@ -275,17 +466,18 @@ def get_pulse_modulation_settings(
         sine_generator_index: Selects which sine generator to use on a given
             channel.
     """
-    path = f"/{device_id}/sgchannels/{channel_index}/"
+    paths = _channel_paths(device_id, channel_index)
+    path = paths[""]
     settings = [
         (path + f"sines/{sine_generator_index}/oscselect", osc_index),
         (path + f"sines/{sine_generator_index}/phaseshift", phase),
         (path + f"oscs/{osc_index}/freq", osc_frequency),
-        (path + "awg/modulation/enable", enable),
-        (path + "awg/outputamplitude", global_amp),
-        (path + "awg/outputs/0/gains/0", gains[0]),
-        (path + "awg/outputs/0/gains/1", gains[1]),
-        (path + "awg/outputs/1/gains/0", gains[2]),
-        (path + "awg/outputs/1/gains/1", gains[3]),
+        (paths["awg/modulation/enable"], enable),
+        (paths["awg/outputamplitude"], global_amp),
+        (paths["awg/outputs/0/gains/0"], gains[0]),
+        (paths["awg/outputs/0/gains/1"], gains[1]),
+        (paths["awg/outputs/1/gains/0"], gains[2]),
+        (paths["awg/outputs/1/gains/1"], gains[3]),
     ]
 
     return settings
@@ -340,7 +532,8 @@ def get_sine_generation_settings(
         sine_generator_index: Selects which sine generator to use on a given
             channel.
     """
-    path = f"/{device_id}/sgchannels/{channel_index}/sines/{sine_generator_index}/"
+    channel_path = _channel_paths(device_id, channel_index)[""]
+    path = channel_path + f"sines/{sine_generator_index}/"
     settings = [
         (path + "i/enable", enable),
         (path + "q/enable", enable),
@@ -349,10 +542,7 @@ def get_sine_generation_settings(
         (path + "q/sin/amplitude", gains[2]),
         (path + "q/cos/amplitude", gains[3]),
         (path + "oscselect", osc_index),
-        (
-            f"/{device_id}/sgchannels/{channel_index}/oscs/{osc_index}/freq",
-            osc_frequency,
-        ),
+        (channel_path + f"oscs/{osc_index}/freq", osc_frequency),
         (path + "phaseshift", phase),
     ]
 
@@ -369,3 +559,95 @@ configure_sine_generation = configure_maker(
     continuous wave signals without the AWG.""",
     ),
 )
+
+
+def configure_channel_full(
+    daq: ziDAQServer,
+    device_id: str,
+    channel_index: int,
+    *,
+    channel: t.Optional[t.Dict[str, t.Any]] = None,
+    marker_and_trigger: t.Optional[t.Dict[str, t.Any]] = None,
+    pulse_modulation: t.Optional[t.Dict[str, t.Any]] = None,
+    sine_generation: t.Optional[t.Dict[str, t.Any]] = None,
+) -> None:
+    """Configures multiple aspects of a specified channel at once.
+
+    The settings are applied in a single transaction instead of one per
+    configure function.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFSG device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        channel_index: Index of the used SG channel.
+        channel: Keyword arguments for configure_channel. If None, the RF
+            input and output are not configured.
+        marker_and_trigger: Keyword arguments for configure_marker_and_trigger.
+            If None, the trigger inputs and marker outputs are not configured.
+        pulse_modulation: Keyword arguments for configure_pulse_modulation. If
+            None, the pulse modulation is not configured.
+        sine_generation: Keyword arguments for configure_sine_generation. If
+            None, the sine generator output is not configured.
+
+    .. versionadded:: 0.5
+    """
+    with batched_config(daq):
+        if channel is not None:
+            configure_channel(daq, device_id, channel_index, **channel)
+        if marker_and_trigger is not None:
+            configure_marker_and_trigger(
+                daq, device_id, channel_index, **marker_and_trigger
+            )
+        if pulse_modulation is not None:
+            configure_pulse_modulation(
+                daq, device_id, channel_index, **pulse_modulation
+            )
+        if sine_generation is not None:
+            configure_sine_generation(daq, device_id, channel_index, **sine_generation)
+
+
+def configure_channels(
+    daq: ziDAQServer,
+    device_id: str,
+    channel_indices: t.Iterable[int],
+    *,
+    channel: t.Optional[t.Dict[str, t.Any]] = None,
+    marker_and_trigger: t.Optional[t.Dict[str, t.Any]] = None,
+    pulse_modulation: t.Optional[t.Dict[str, t.Any]] = None,
+    sine_generation: t.Optional[t.Dict[str, t.Any]] = None,
+) -> None:
+    """Configures multiple channels identically at once.
+
+    The settings of all channels are applied in a single transaction instead
+    of one per channel and configure function.
+
+    Args:
+        daq: Instance of a Zurich Instruments API session connected to a Data
+            Server. The device with identifier device_id is assumed to already
+            be connected to this instance.
+        device_id: SHFSG device identifier, e.g. `dev12004` or 'shf-dev12004'.
+        channel_indices: Indices of the SG channels to configure.
+        channel: Keyword arguments for configure_channel. If None, the RF
+            input and output are not configured.
+        marker_and_trigger: Keyword arguments for configure_marker_and_trigger.
+            If None, the trigger inputs and marker outputs are not configured.
+        pulse_modulation: Keyword arguments for configure_pulse_modulation. If
+            None, the pulse modulation is not configured.
+        sine_generation: Keyword arguments for configure_sine_generation. If
+            None, the sine generator output is not configured.
+
+    .. versionadded:: 0.5
+    """
+    with batched_config(daq):
+        for channel_index in channel_indices:
+            configure_channel_full(
+                daq,
+                device_id,
+                channel_index,
+                channel=channel,
+                marker_and_trigger=marker_and_trigger,
+                pulse_modulation=pulse_modulation,
+                sine_generation=sine_generation,
+            )
@@ -4,13 +4,21 @@ This module provides basic utility functions to ease the use of the native
 Python API zhinst-core.
 """
 
+import asyncio
+import hashlib
+import itertools
+import logging
 import os
 import re
 import time
 import warnings
 import socket
+import weakref
 import typing as t
-from pathlib import Path
+from collections import namedtuple
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path, PurePath
 import datetime
 
 try:
@@ -23,6 +31,28 @@ except ImportError as e:
 import numpy as np
 import zhinst.core as zi
 
+logger = logging.getLogger(__name__)
+
+# Interface of the last successful connection per device, see create_api_session().
+_CONNECTED_INTERFACES: t.Dict[str, str] = {}
+# Time and discovery properties per device, see create_api_session().
+_DISCOVERY_CACHE: t.Dict[str, t.Tuple[float, t.Dict]] = {}
+# Time and address per data server host name, see create_api_session().
+_HOST_CACHE: t.Dict[str, t.Tuple[float, str]] = {}
+# Time in seconds for which discovery properties and addresses are reused.
+_DISCOVERY_CACHE_TTL = 10.0
+
+
+@dataclass
+class _SessionInfo:
+    """Information about the Session, see create_api_session()."""
+
+    device_serial: str
+    api_level: int
+    data_server: t.Optional[t.Tuple[str, int]] = None
+    interfaces: t.Optional[t.List[str]] = None
+    daq: t.Optional[zi.ziDAQServer] = None
+
 
 def create_api_session(
     device_serial: str,
@@ -60,6 +90,12 @@ def create_api_session(
         device's node branch in the data server's node tree.
       props: The device's discovery properties as returned by the
         ziDiscovery get() method.
+
+    .. versionchanged:: 0.5
+
+        The discovery properties of a device and the address of the data
+        server are reused for 10 seconds, see clear_discovery_cache. They are
+        discarded if the session could not be created with them.
     """
     if required_devtype is not None:
         raise DeprecationWarning(
@@ -77,15 +113,6 @@ def create_api_session(
             "in the future."
         )
 
-    class SessionInfo:
-        """Information about the Session."""
-
-        device_serial = None
-        data_server = None
-        interfaces = None
-        api_level = None
-        daq = None
-
     if not device_serial.startswith("dev"):
         # Assume it has a prefix (e.g. 'mf-', 'uhf-') and strip that away
         prefix_end = device_serial.find("-")
@@ -97,13 +124,18 @@ def create_api_session(
                 "dev3225 or uhf-dev2123."
             )
 
-    session_info = SessionInfo()
-    session_info.device_serial = device_serial
-    session_info.api_level = api_level
+    session_info = _SessionInfo(device_serial, api_level)
 
-    discovery = zi.ziDiscovery()
-    device_id = discovery.find(session_info.device_serial).lower()
-    discovery_info = discovery.get(device_id)
+    # Discovery broadcasts on the network, reuse a recent result for the device.
+    now = time.monotonic()
+    cached = _DISCOVERY_CACHE.get(session_info.device_serial)
+    if cached is not None and now - cached[0] < _DISCOVERY_CACHE_TTL:
+        discovery_info = dict(cached[1])
+    else:
+        discovery = zi.ziDiscovery()
+        device_id = discovery.find(session_info.device_serial).lower()
+        discovery_info = discovery.get(device_id)
+        _DISCOVERY_CACHE[session_info.device_serial] = (now, dict(discovery_info))
 
     if server_host is None:
         if discovery_info["serveraddress"] != "127.0.0.1" and not discovery_info[
@@ -113,6 +145,7 @@ def create_api_session(
                 "Please provide a server address for a data server."
             )
         if not discovery_info["discoverable"]:
+            _DISCOVERY_CACHE.pop(session_info.device_serial, None)
             raise RuntimeError(
                 "The specified device {} is not discoverable from the API."
                 "Please ensure the device is powered-on and visible using the "
@@ -125,9 +158,20 @@ def create_api_session(
             discovery_info["serverport"],
         )
     else:
-        session_info.data_server = (socket.gethostbyname(server_host), server_port)
-
-    session_info.interfaces = discovery_info["interfaces"]
+        cached = _HOST_CACHE.get(server_host)
+        if cached is not None and now - cached[0] < _DISCOVERY_CACHE_TTL:
+            server_address = cached[1]
+        else:
+            server_address = socket.gethostbyname(server_host)
+            _HOST_CACHE[server_host] = (now, server_address)
+        session_info.data_server = (server_address, server_port)
+
+    # Try the interface that worked last time first, failed attempts can take
+    # a while to time out.
+    last_interface = _CONNECTED_INTERFACES.get(session_info.device_serial)
+    session_info.interfaces = sorted(
+        discovery_info["interfaces"], key=lambda interface: interface != last_interface
+    )
 
     if not discovery_info["available"]:
         if (
@@ -141,6 +185,7 @@ def create_api_session(
                 error_message += "In use by {}".format(discovery_info["owner"])
             else:
                 error_message += discovery_info["status"]
+            _DISCOVERY_CACHE.pop(session_info.device_serial, None)
             raise RuntimeError(error_message)
     try:
         session_info.daq = zi.ziDAQServer(
@@ -149,6 +194,9 @@ def create_api_session(
             session_info.api_level,
         )
     except RuntimeError as error:
+        _DISCOVERY_CACHE.pop(session_info.device_serial, None)
+        if server_host is not None:
+            _HOST_CACHE.pop(server_host, None)
         raise RuntimeError(
             "Failed to connect to the data server {}:"
             "{}".format(session_info.data_server[0], session_info.data_server[1])
@@ -158,27 +206,27 @@ def create_api_session(
 
     for interface in session_info.interfaces:
         try:
-            print(
-                "Trying to connect to {} on interface {}".format(
-                    session_info.device_serial, interface
-                )
+            logger.info(
+                "Trying to connect to %s on interface %s",
+                session_info.device_serial,
+                interface,
             )
             session_info.daq.connectDevice(session_info.device_serial, interface)
             connected = True
-            print(
-                "Connected to {} via data server "
-                "{}:{} and interface {}".format(
-                    session_info.device_serial,
-                    session_info.data_server[0],
-                    session_info.data_server[1],
-                    interface,
-                )
+            _CONNECTED_INTERFACES[session_info.device_serial] = interface
+            logger.info(
+                "Connected to %s via data server %s:%s and interface %s",
+                session_info.device_serial,
+                session_info.data_server[0],
+                session_info.data_server[1],
+                interface,
             )
             break
         except Exception:
             continue
 
     if not connected:
+        _DISCOVERY_CACHE.pop(session_info.device_serial, None)
         raise RuntimeError(
             "Failed to connect device {} to "
             "data server {}. Make sure the "
@@ -190,6 +238,20 @@ def create_api_session(
     return (session_info.daq, session_info.device_serial, discovery_info)
 
 
+def clear_discovery_cache() -> None:
+    """Clear the cached discovery properties used by create_api_session.
+
+    create_api_session reuses the discovery properties of a device and the
+    resolved address of a data server host for 10 seconds. Failed attempts
+    discard the cached entries they used. Needs to be called if the state of a
+    device, e.g. its availability, changed within that time.
+
+    .. versionadded:: 0.5
+    """
+    _DISCOVERY_CACHE.clear()
+    _HOST_CACHE.clear()
+
+
 def api_server_version_check(daq: zi.ziDAQServer) -> bool:
     """Check the consistency of the used version in the LabOne stack.
 
@@ -206,11 +268,23 @@ def api_server_version_check(daq: zi.ziDAQServer) -> bool:
 
     Raises:
         Warning: If the Versions of API and Data Server do not match.
+
+    .. versionchanged:: 0.5
+
+        The version of the Data Server is only queried once per API session.
     """
     api_version = daq.version()
     api_revision = daq.revision()
-    server_version = daq.getString("/zi/about/version")
-    server_revision = daq.getInt("/zi/about/revision")
+    key = (_session_key(daq),)
+    server_about = _SERVER_ABOUT_CACHE.get(key)
+    if server_about is None:
+        data = daq.get("/zi/about/version,/zi/about/revision", flat=True)
+        server_about = (
+            data["/zi/about/version"]["value"][0],
+            data["/zi/about/revision"]["value"][0],
+        )
+        _SERVER_ABOUT_CACHE[key] = server_about
+    server_version, server_revision = server_about
     if api_version != server_version:
         message = (
             "There is a mismatch between the versions of the API and Data Server. "
@@ -225,6 +299,18 @@ def api_server_version_check(daq: zi.ziDAQServer) -> bool:
     return True
 
 
+# Per device type: the option which disables the default mixer channels, the
+# mixer channel per hardware output channel and the name of the device family.
+_OUTPUT_MIXER_CHANNELS = {
+    "UHFLI": ("MF", (3, 7), "UHF"),
+    "UHFAWG": ("MF", (3, 7), "UHF"),
+    "UHFQA": (None, (0, 1), "UHF"),
+    "HF2LI": ("MF", (6, 7), "HF2"),
+    "MFLI": ("MD", (1,), "MF"),
+    "MFIA": ("MD", (1,), "MF"),
+}
+
+
 def default_output_mixer_channel(
     discovery_props: t.Dict, output_channel: int = 0
 ) -> int:
@@ -248,8 +334,10 @@ def default_output_mixer_channel(
     Raises:
       Exception: If an invalid signal input index was provided.
     """
+    device_type = discovery_props["devicetype"]
+    options = discovery_props["options"]
     # The logic below assumes the device type is one of the following.
-    assert discovery_props["devicetype"] in [
+    assert device_type in [
         "HF2IS",
         "HF2LI",
         "UHFLI",
@@ -257,51 +345,22 @@ def default_output_mixer_channel(
         "UHFQA",
         "MFIA",
         "MFLI",
-    ], "Unknown device type: {}.".format(discovery_props["devicetype"])
-
-    if re.match(r"UHF(LI|AWG)", discovery_props["devicetype"]) and (
-        "MF" not in discovery_props["options"]
-    ):
-        if output_channel == 0:
-            return 3
-        if output_channel == 1:
-            return 7
-        raise Exception(
-            "Invalid output channel `{}`, UHF Instruments have two signal "
-            "ouput channels (0, 1).".format(output_channel)
-        )
-
-    if re.match(r"UHFQA", discovery_props["devicetype"]):
-        if output_channel == 0:
-            return 0
-        if output_channel == 1:
-            return 1
-        raise Exception(
-            "Invalid output channel `{}`, UHF Instruments have two signal "
-            "ouput channels (0, 1).".format(output_channel)
-        )
-
-    if re.match(r"HF2LI", discovery_props["devicetype"]) and (
-        "MF" not in discovery_props["options"]
-    ):
-        if output_channel == 0:
-            return 6
-        if output_channel == 1:
-            return 7
-        raise Exception(
-            "Invalid output channel `{}`, HF2 Instruments have two signal output"
-            "channels (0, 1).".format(output_channel)
-        )
-
-    if re.match(r"(MFLI|MFIA)", discovery_props["devicetype"]) and (
-        "MD" not in discovery_props["options"]
-    ):
-        if output_channel == 0:
-            return 1
-        raise Exception(
-            f"Invalid output channel `{output_channel}`, MF Instruments have one "
-            "signal output channel (0)."
-        )
+    ], "Unknown device type: {}.".format(device_type)
+
+    if device_type in _OUTPUT_MIXER_CHANNELS:
+        option, mixer_channels, family = _OUTPUT_MIXER_CHANNELS[device_type]
+        if option is None or option not in options:
+            if 0 <= output_channel < len(mixer_channels):
+                return mixer_channels[output_channel]
+            if len(mixer_channels) == 1:
+                raise Exception(
+                    f"Invalid output channel `{output_channel}`, {family} "
+                    "Instruments have one signal output channel (0)."
+                )
+            raise Exception(
+                f"Invalid output channel `{output_channel}`, {family} Instruments "
+                "have two signal output channels (0, 1)."
+            )
 
     return 0 if output_channel == 0 else 1
 
@@ -334,16 +393,13 @@ def autoDetect(daq: zi.ziDAQServer, exclude: t.List[str] = None) -> str:
     device = zhinst.utils.autoDetect(daq)
     ```
     """
-    if not isinstance(daq, zi.ziDAQServer):
-        raise RuntimeError("First argument must be an instance of core.ziDAQServer")
-    nodes = daq.listNodes("/", 0)
-    devs = [node for node in nodes if re.match("dev*", node, re.IGNORECASE)]
+    devs = devices(daq)
     if exclude is None:
         exclude = []
     if not isinstance(exclude, list):
         exclude = [exclude]
     exclude = [x.lower() for x in exclude]
-    devs = [dev for dev in devs if dev.lower() not in exclude]
+    devs = [dev for dev in devs if dev not in exclude]
     if not devs:
         raise RuntimeError(
             "No Device found. Make sure that the device is connected to the host via "
@@ -352,8 +408,8 @@ def autoDetect(daq: zi.ziDAQServer, exclude: t.List[str] = None) -> str:
         )
     # Found at least one device -> selection valid.
     # Select the first one
-    device = devs[0].lower()
-    print("autoDetect selected the device", device, "for the measurement.")
+    device = devs[0]
+    logger.info("autoDetect selected the device %s for the measurement.", device)
     return device
 
 
@@ -384,9 +440,8 @@ def devices(daq: zi.ziDAQServer) -> t.List[str]:
     """
     if not isinstance(daq, zi.ziDAQServer):
         raise RuntimeError("First argument must be an instance of core.ziDAQServer")
-    nodes = daq.listNodes("/", 0)
-    devs = [node for node in nodes if re.match("dev*", node, re.IGNORECASE)]
-    return list(x.lower() for x in list(devs))
+    nodes = (node.lower() for node in daq.listNodes("/", 0))
+    return [node for node in nodes if node.startswith("dev")]
 
 
 def autoConnect(default_port: int = None, api_level: int = None) -> zi.ziDAQServer:
@@ -450,12 +505,10 @@ def autoConnect(default_port: int = None, api_level: int = None) -> zi.ziDAQServ
             "devices() returned an empty list: No devices are connected to this PC."
         ).format(default_port, api_level)
         # We have a server running and a device, we're done
-        print(
-            "autoConnect connected to a server on port",
+        logger.info(
+            "autoConnect connected to a server on port %s using API level %s.",
             default_port,
-            "using API level",
             api_level,
-            ".",
         )
         return daq
     except (RuntimeError, AssertionError) as e:
@@ -498,12 +551,10 @@ def autoConnect(default_port: int = None, api_level: int = None) -> zi.ziDAQServ
             "devices() returned an empty list: No devices are connected to this PC."
         ).format(secondary_port, api_level)
         # We have a server running and a device, we're done
-        print(
-            "autoConnect connected to a server on port",
-            default_port,
-            "using API level",
+        logger.info(
+            "autoConnect connected to a server on port %s using API level %s.",
+            secondary_port,
             api_level,
-            ".",
         )
         return daq
     except (RuntimeError, AssertionError) as e:
@@ -526,6 +577,27 @@ def autoConnect(default_port: int = None, api_level: int = None) -> zi.ziDAQServ
     raise RuntimeError(error_msg)
 
 
+def _wait_until_done(
+    is_busy: t.Callable[[], t.Any], timeout: float, max_sleep_time: float
+) -> bool:
+    """Wait until is_busy returns False, polling with an increasing interval.
+
+    The interval starts at 1 ms and doubles up to max_sleep_time, so that fast
+    operations are noticed early without polling slow ones too often.
+
+    Returns:
+      False if is_busy still returned True after timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    sleep_time = 0.001
+    while is_busy():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(sleep_time)
+        sleep_time = min(2 * sleep_time, max_sleep_time)
+    return True
+
+
 def sigin_autorange(daq: zi.ziDAQServer, device: str, in_channel: int) -> float:
     """Perform an automatic adjustment of the signal input range.
 
@@ -578,15 +650,12 @@ def sigin_autorange(daq: zi.ziDAQServer, device: str, in_channel: int) -> float:
     # The node /device/sigins/in_channel/autorange has the value of 1 until an
     # appropriate range has been configured by the device, wait until the
     # autorange routing on the device has finished.
-    t0 = time.time()
     timeout = 30
-    while daq.getInt(autorange_path):
-        time.sleep(0.010)
-        if time.time() - t0 > timeout:
-            raise RuntimeError(
-                "Signal input autorange failed to complete after after %.f seconds."
-                % timeout
-            )
+    if not _wait_until_done(lambda: daq.getInt(autorange_path), timeout, 0.01):
+        raise RuntimeError(
+            "Signal input autorange failed to complete after after %.f seconds."
+            % timeout
+        )
     return daq.getDouble("/{}/sigins/{}/range".format(device, in_channel))
 
 
@@ -605,6 +674,61 @@ def get_default_settings_path(daq: zi.ziDAQServer) -> str:
     return settings_path
 
 
+def _settings_file_location(filename: t.Union[str, os.PathLike]) -> t.Tuple[str, str]:
+    """Split a settings filename into the directory and the name without suffix.
+
+    Args:
+      filename: Filename of the settings file, optionally including a path.
+
+    Returns:
+      Directory of the file (the current directory if none is given) and the
+      filename without its extension.
+    """
+    file_path = PurePath(filename)
+    if file_path.parent == PurePath("."):
+        return "." + os.sep, file_path.stem
+    return str(file_path.parent), file_path.stem
+
+
+def _execute_device_settings(
+    daq: zi.ziDAQServer, device: str, filename: str, command: str
+) -> None:
+    """Load or save device settings and wait until the command has finished.
+
+    The deviceSettings module is created once per API session and reused by
+    later calls. It is only cleared if the command did not finish.
+
+    Raises:
+      RuntimeError: If the command times out.
+    """
+    key = (_session_key(daq),)
+    # Taken out of the cache while in use, concurrent calls create their own.
+    device_settings = _DEVICE_SETTINGS_MODULES.pop(key, None)
+    if device_settings is None:
+        device_settings = daq.deviceSettings()
+    path, filename_noext = _settings_file_location(filename)
+    device_settings.set("device", device)
+    device_settings.set("filename", filename_noext)
+    device_settings.set("path", path)
+    device_settings.set("command", command)
+    timeout = 60
+    finished = False
+    try:
+        device_settings.execute()
+        finished = _wait_until_done(
+            lambda: not device_settings.finished(), timeout, 0.05
+        )
+    finally:
+        if finished:
+            _DEVICE_SETTINGS_MODULES[key] = device_settings
+        else:
+            device_settings.clear()
+    if not finished:
+        raise RuntimeError(
+            "Unable to %s device settings after %.f seconds." % (command, timeout)
+        )
+
+
 def load_settings(daq: zi.ziDAQServer, device: str, filename: str) -> None:
     """Load a LabOne settings file to the specified device.
 
@@ -632,29 +756,13 @@ def load_settings(daq: zi.ziDAQServer, device: str, filename: str) -> None:
     path = utils.get_default_settings_path(daq)
     utils.load_settings(daq, dev, path + os.sep + filename)
     ```
+
+    .. versionchanged:: 0.5
+
+        The deviceSettings module is reused by later calls with the same API
+        session.
     """
-    path, filename = os.path.split(filename)
-    filename_noext = os.path.splitext(filename)[0]
-    device_settings = daq.deviceSettings()
-    device_settings.set("device", device)
-    device_settings.set("filename", filename_noext)
-    if path:
-        device_settings.set("path", path)
-    else:
-        device_settings.set("path", "." + os.sep)
-    device_settings.set("command", "load")
-    try:
-        device_settings.execute()
-        t0 = time.time()
-        timeout = 60
-        while not device_settings.finished():
-            time.sleep(0.05)
-            if time.time() - t0 > timeout:
-                raise RuntimeError(
-                    "Unable to load device settings after %.f seconds." % timeout
-                )
-    finally:
-        device_settings.clear()
+    _execute_device_settings(daq, device, filename, "load")
 
 
 def save_settings(daq: zi.ziDAQServer, device: str, filename: str) -> None:
@@ -686,29 +794,13 @@ def save_settings(daq: zi.ziDAQServer, device: str, filename: str) -> None:
     path = utils.get_default_settings_path(daq)
     utils.save_settings(daq, dev, path + os.sep + filename)
     ```
+
+    .. versionchanged:: 0.5
+
+        The deviceSettings module is reused by later calls with the same API
+        session.
     """
-    path, filename = os.path.split(filename)
-    filename_noext = os.path.splitext(filename)[0]
-    device_settings = daq.deviceSettings()
-    device_settings.set("device", device)
-    device_settings.set("filename", filename_noext)
-    if path:
-        device_settings.set("path", path)
-    else:
-        device_settings.set("path", "." + os.sep)
-    device_settings.set("command", "save")
-    try:
-        device_settings.execute()
-        t0 = time.time()
-        timeout = 60
-        while not device_settings.finished():
-            time.sleep(0.05)
-            if time.time() - t0 > timeout:
-                raise RuntimeError(
-                    "Unable to save device settings after %.f seconds." % timeout
-                )
-    finally:
-        device_settings.clear()
+    _execute_device_settings(daq, device, filename, "save")
 
 
 # The names correspond to the data in the columns of a CSV file saved by the
@@ -737,6 +829,20 @@ ZICONTROL_FORMATS = ("f8", "f8", "f8", "f8", "u4", "f8", "f8")
 ZICONTROL_DTYPE = list(zip(ZICONTROL_NAMES, ZICONTROL_FORMATS))
 
 
+def _select_columns(
+    dtypes: t.Sequence[t.Tuple[str, str]], column_names: t.Iterable[str]
+) -> t.Tuple[t.List[int], t.List[t.Tuple[str, str]]]:
+    """Return the indices and dtypes of the named columns, in file order."""
+    names = frozenset(column_names)
+    cols = []
+    dtype = []
+    for col, dt in enumerate(dtypes):
+        if dt[0] in names:
+            cols.append(col)
+            dtype.append(dt)
+    return cols, dtype
+
+
 def load_labone_demod_csv(
     fname: t.Union[str, Path], column_names: t.List[str] = LABONE_DEMOD_NAMES
 ) -> np.ndarray:
@@ -769,13 +875,8 @@ def load_labone_demod_csv(
     assert set(column_names).issubset(
         LABONE_DEMOD_NAMES
     ), "Invalid name in ``column_names``, valid names are: %s" % str(LABONE_DEMOD_NAMES)
-    cols = [
-        col for col, dtype in enumerate(LABONE_DEMOD_DTYPE) if dtype[0] in column_names
-    ]
-    dtype = [dt for dt in LABONE_DEMOD_DTYPE if dt[0] in column_names]
-    sample = np.genfromtxt(
-        fname, delimiter=";", dtype=dtype, usecols=cols, skip_header=1
-    )
+    cols, dtype = _select_columns(LABONE_DEMOD_DTYPE, column_names)
+    sample = np.loadtxt(fname, delimiter=";", dtype=dtype, usecols=cols, skiprows=1)
     return sample
 
 
@@ -803,11 +904,26 @@ def load_labone_csv(fname: str) -> np.ndarray:
     plt.plot(data['timestamp'], data['value'])
     ```
     """
+    # Infer the column names and types from the first row only. For numeric
+    # columns the whole file can then be parsed by the much faster loadtxt.
+    with open(fname) as file:
+        first_row = np.genfromtxt(
+            itertools.islice(file, 2), delimiter=";", dtype=None, names=True
+        )
+    dtype = first_row.dtype
+    if dtype.names and all(dtype[name].kind in "iuf" for name in dtype.names):
+        try:
+            return np.loadtxt(fname, delimiter=";", dtype=dtype, skiprows=1)
+        except ValueError:
+            # E.g. an integer column which contains floats in later rows.
+            pass
     data = np.genfromtxt(fname, delimiter=";", dtype=None, names=True)
     return data
 
 
-def load_labone_mat(filename: str) -> t.Dict:
+def load_labone_mat(
+    filename: str, variable_names: t.Optional[t.Sequence[str]] = None
+) -> t.Dict:
     """Load a mat file generated from LabOne.
 
     A wrapper function for loading a MAT file as saved by the LabOne User
@@ -817,6 +933,10 @@ def load_labone_mat(filename: str) -> t.Dict:
 
     Args:
       filename: the name of the MAT file to load.
+      variable_names: Names of the top-level variables (e.g. the device IDs)
+        to load. Other variables are skipped without being decoded, which
+        saves time and memory for large files. Default is to load all
+        variables.
 
     Returns:
       A nested dictionary containing the instrument data as
@@ -857,9 +977,13 @@ def load_labone_mat(filename: str) -> t.Dict:
     # e.g., is accessed as following:
     x = data[device][0,0]['demods'][0,1]['sample'][0,0]['x'][0]
     ```
+
+    .. versionchanged:: 0.5
+
+        Added the variable_names argument.
     """
     try:
-        data = scipy.io.loadmat(filename)
+        data = scipy.io.loadmat(filename, variable_names=variable_names)
         return data
     except (NameError, AttributeError):
         print(
@@ -907,12 +1031,12 @@ def load_zicontrol_csv(
     assert set(column_names).issubset(
         ZICONTROL_NAMES
     ), "Invalid name in ``column_names``, valid names are: %s" % str(ZICONTROL_NAMES)
-    cols = [
-        col for col, dtype in enumerate(ZICONTROL_DTYPE) if dtype[0] in column_names
-    ]
-    dtype = [dt for dt in ZICONTROL_DTYPE if dt[0] in column_names]
-    sample = np.genfromtxt(filename, delimiter=",", dtype=dtype, usecols=cols)
-    return sample
+    cols, dtype = _select_columns(ZICONTROL_DTYPE, column_names)
+    try:
+        return np.loadtxt(filename, delimiter=",", dtype=dtype, usecols=cols)
+    except ValueError:
+        # E.g. missing values, which only genfromtxt fills in.
+        return np.genfromtxt(filename, delimiter=",", dtype=dtype, usecols=cols)
 
 
 def load_zicontrol_zibin(
@@ -950,20 +1074,17 @@ def load_zicontrol_zibin(
     assert set(column_names).issubset(
         ZICONTROL_NAMES
     ), "Invalid name in ``column_names``, valid names are: %s." % str(ZICONTROL_NAMES)
-    sample = np.fromfile(filename, dtype=">f8")
-    rem = np.size(sample) % len(ZICONTROL_NAMES)
+    data = np.fromfile(filename, dtype=">f8")
+    rem = np.size(data) % len(ZICONTROL_NAMES)
     assert rem == 0, str(
         "Incorrect number of data points in ziBin file, the number of data points "
         "must be divisible by the number of demodulator fields."
     )
-    n = np.size(sample) / len(ZICONTROL_NAMES)
-    sample = np.reshape(sample, (n, len(ZICONTROL_NAMES))).transpose()
-    cols = [
-        col for col, dtype in enumerate(ZICONTROL_DTYPE) if dtype[0] in column_names
-    ]
-    dtype = [dt for dt in ZICONTROL_DTYPE if dt[0] in column_names]
-    sample = np.core.records.fromarrays(sample[cols, :], dtype=dtype)
-    return sample
+    # Each sample is stored as consecutive big-endian doubles, one per field.
+    sample = data.view([(name, ">f8") for name in ZICONTROL_NAMES])
+    _, dtype = _select_columns(ZICONTROL_DTYPE, column_names)
+    sample = sample[[name for name, _ in dtype]].astype(dtype)
+    return sample.view(np.recarray)
 
 
 def check_for_sampleloss(timestamps: np.ndarray) -> np.ndarray:
@@ -984,27 +1105,53 @@ def check_for_sampleloss(timestamps: np.ndarray) -> np.ndarray:
       A 1-dimensional array indicating the indices in timestamp where
       sampleloss has occurred. An empty array is returned in no sampleloss was
       present.
+
+    .. versionchanged:: 0.5
+
+        A single warning is issued for all detected sample loss. The individual
+        occurrences are logged at DEBUG level.
     """
+    dtimestamps = np.diff(timestamps)
     # If the second difference of the timestamps is zero, no sampleloss has occurred
-    index = np.where(np.diff(timestamps, n=2) > 0.1)[0] + 1
+    index = np.where(np.diff(dtimestamps) > 0.1)[0] + 1
     # Find the true dtimestamps (determined by the configured sampling rate)
-    dtimestamp = np.nan
-    for i in range(0, np.shape(timestamps)[0]):
-        # Take the sampling rate from a point where sample loss has not
-        # occurred.
-        if i not in index:
-            dtimestamp = timestamps[i + 1] - timestamps[i]
-            break
-    assert not np.isnan(dtimestamp)
-    for i in index:
-        warnings.warn(
-            "Sample loss detected at timestamps={} (index: {}, {} points).".format(
-                timestamps[i], i, (timestamps[i + 1] - timestamps[i]) / dtimestamp
-            )
+    # from a point where sample loss has not occurred. The indices of sample loss
+    # start at 1, so that is always the case for the first difference.
+    dtimestamp = dtimestamps[0]
+    if index.size:
+        points = dtimestamps[index] / dtimestamp
+        message = "Sample loss detected at timestamps={} (index: {}, {} points)".format(
+            timestamps[index[0]], index[0], points[0]
         )
+        if index.size > 1:
+            message += " and at {} more timestamps (up to {} points)".format(
+                index.size - 1, points[1:].max()
+            )
+        warnings.warn(message + ".")
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, num_points in zip(index, points):
+                logger.debug(
+                    "Sample loss detected at timestamps=%s (index: %s, %s points).",
+                    timestamps[i],
+                    i,
+                    num_points,
+                )
     return index
 
 
+# Scaling factor for bandwidth to timeconstant per demodulator order.
+_BWTC_SCALING_FACTORS = {
+    1: 1.0,
+    2: 0.643594,
+    3: 0.509825,
+    4: 0.434979,
+    5: 0.385614,
+    6: 0.349946,
+    7: 0.322629,
+    8: 0.300845,
+}
+
+
 def bwtc_scaling_factor(order: int) -> float:
     """Return the appropriate scaling factor for bandwidth to timeconstant.
 
@@ -1016,23 +1163,12 @@ def bwtc_scaling_factor(order: int) -> float:
     Returns:
         Scaling factor for the bandwidth to timeconstant.
     """
-    if order == 1:
-        return 1.0
-    if order == 2:
-        return 0.643594
-    if order == 3:
-        return 0.509825
-    if order == 4:
-        return 0.434979
-    if order == 5:
-        return 0.385614
-    if order == 6:
-        return 0.349946
-    if order == 7:
-        return 0.322629
-    if order == 8:
-        return 0.300845
-    raise RuntimeError("Error: Order (%d) must be between 1 and 8.\n" % order)
+    try:
+        return _BWTC_SCALING_FACTORS[order]
+    except KeyError:
+        raise RuntimeError(
+            "Error: Order (%d) must be between 1 and 8.\n" % order
+        ) from None
 
 
 def bw2tc(bandwidth: float, order: int) -> float:
@@ -1045,7 +1181,7 @@ def bw2tc(bandwidth: float, order: int) -> float:
     Returns:
       The equivalent demodulator timeconstant.
     """
-    return bwtc_scaling_factor(order) / (2 * np.pi * bandwidth)
+    return bwtc_scaling_factor(order) / (2 * np.pi) / bandwidth
 
 
 def tc2bw(timeconstant: float, order: int) -> float:
@@ -1059,7 +1195,7 @@ def tc2bw(timeconstant: float, order: int) -> float:
     Returns:
       The demodulator 3dB bandwidth to convert.
     """
-    return bwtc_scaling_factor(order) / (2 * np.pi * timeconstant)
+    return bwtc_scaling_factor(order) / (2 * np.pi) / timeconstant
 
 
 def systemtime_to_datetime(systemtime: int) -> datetime.datetime:
@@ -1075,11 +1211,65 @@ def systemtime_to_datetime(systemtime: int) -> datetime.datetime:
     Returns:
         datetime object.
     """
-    systemtime_sec, systemtime_microsec = divmod(systemtime, 1e6)
+    # Integer division, a float cannot represent every microsecond timestamp.
+    systemtime_sec, systemtime_microsec = divmod(int(systemtime), 1000000)
     # Create a datetime object from epoch timestamp with 0 microseconds.
     time_formated = datetime.datetime.fromtimestamp(systemtime_sec)
     # Set the number of microseconds in the datetime object.
-    return time_formated.replace(microsecond=int(systemtime_microsec))
+    return time_formated.replace(microsecond=systemtime_microsec)
+
+
+# Settings applied by disable_everything as (path, value, required node). A
+# setting is only applied if the device has the top-level branch of its path
+# and, if given, the required node.
+_DISABLE_EVERYTHING_SETTINGS: t.Tuple[t.Tuple[str, t.Any, t.Optional[str]], ...] = (
+    ("aucarts/*/enable", 0, None),
+    ("aupolars/*/enable", 0, None),
+    ("awgs/*/enable", 0, None),
+    ("boxcars/*/enable", 0, None),
+    ("cnts/*/enable", 0, None),
+    ("currins/*/float", 0, "currins/0/float"),
+    ("dios/*/drive", 0, None),
+    ("demods/*/enable", 0, None),
+    ("demods/*/trigger", 0, None),
+    ("demods/*/sinc", 0, None),
+    ("demods/*/oscselect", 0, None),
+    ("demods/*/harmonic", 1, None),
+    ("demods/*/phaseshift", 0, None),
+    ("extrefs/*/enable", 0, None),
+    ("imps/*/enable", 0, None),
+    ("inputpwas/*/enable", 0, None),
+    # HF2 without the MOD Option has an empty MODS branch.
+    ("mods/*/enable", 0, "mods/0/enable"),
+    ("outputpwas/*/enable", 0, None),
+    # HF2 without the PID Option has an empty PID branch.
+    ("pids/*/enable", 0, "pids/0/enable"),
+    # HF2 without the PLL Option still has the PLLS branch.
+    ("plls/*/enable", 0, "plls/0/enable"),
+    ("sigins/*/ac", 0, None),
+    ("sigins/*/imp50", 0, None),
+    ("sigins/*/diff", 0, "sigins/0/diff"),
+    ("sigins/*/float", 0, "sigins/0/float"),
+    ("sigouts/*/on", 0, None),
+    ("sigouts/*/enables/*", 0, None),
+    ("sigouts/*/offset", 0.0, None),
+    ("sigouts/*/add", 0, "sigouts/0/add"),
+    ("sigouts/*/diff", 0, "sigouts/0/diff"),
+    ("sigouts/*/imp50", 0, "sigouts/0/imp50"),
+    ("sigouts/*/precompensation/enable", 0, "sigouts/0/precompensation"),
+    ("sigouts/*/precompensation/highpass/*/enable", 0, "sigouts/0/precompensation"),
+    (
+        "sigouts/*/precompensation/exponentials/*/enable",
+        0,
+        "sigouts/0/precompensation",
+    ),
+    ("sigouts/*/precompensation/bounces/*/enable", 0, "sigouts/0/precompensation"),
+    ("sigouts/*/precompensation/fir/enable", 0, "sigouts/0/precompensation"),
+    ("scopes/*/enable", 0, None),
+    ("scopes/*/segments/enable", 0, "scopes/0/segments/enable"),
+    ("scopes/*/stream/enables/*", 0, "scopes/0/stream/enables/0"),
+    ("triggers/out/*/drive", 0, None),
+)
 
 
 def disable_everything(daq: zi.ziDAQServer, device: str) -> t.List[t.Tuple[str, int]]:
@@ -1102,93 +1292,29 @@ def disable_everything(daq: zi.ziDAQServer, device: str) -> t.List[t.Tuple[str,
         This function is intended as a helper function for the API's
         examples and it's signature or implementation may change in future releases.
     """
-    node_branches = daq.listNodes("/{}/".format(device), 0)
+    prefix = "/{}/".format(device)
+    node_branches = daq.listNodes(prefix, 0)
     settings = []
     if node_branches == []:
         print("Device", device, "is not connected to the data server.")
         return settings
-
-    if "aucarts" in (node.lower() for node in node_branches):
-        settings.append(["/{}/aucarts/*/enable".format(device), 0])
-    if "aupolars" in (node.lower() for node in node_branches):
-        settings.append(["/{}/aupolars/*/enable".format(device), 0])
-    if "awgs" in (node.lower() for node in node_branches):
-        settings.append(["/{}/awgs/*/enable".format(device), 0])
-    if "boxcars" in (node.lower() for node in node_branches):
-        settings.append(["/{}/boxcars/*/enable".format(device), 0])
-    if "cnts" in (node.lower() for node in node_branches):
-        settings.append(["/{}/cnts/*/enable".format(device), 0])
-    # CURRINS
-    if daq.listNodes("/{}/currins/0/float".format(device), 0) != []:
-        settings.append(["/{}/currins/*/float".format(device), 0])
-    if "dios" in (node.lower() for node in node_branches):
-        settings.append(["/{}/dios/*/drive".format(device), 0])
-    if "demods" in (node.lower() for node in node_branches):
-        settings.append(["/{}/demods/*/enable".format(device), 0])
-        settings.append(["/{}/demods/*/trigger".format(device), 0])
-        settings.append(["/{}/demods/*/sinc".format(device), 0])
-        settings.append(["/{}/demods/*/oscselect".format(device), 0])
-        settings.append(["/{}/demods/*/harmonic".format(device), 1])
-        settings.append(["/{}/demods/*/phaseshift".format(device), 0])
-    if "extrefs" in (node.lower() for node in node_branches):
-        settings.append(["/{}/extrefs/*/enable".format(device), 0])
-    if "imps" in (node.lower() for node in node_branches):
-        settings.append(["/{}/imps/*/enable".format(device), 0])
-    if "inputpwas" in (node.lower() for node in node_branches):
-        settings.append(["/{}/inputpwas/*/enable".format(device), 0])
-    if daq.listNodes("/{}/mods/0/enable".format(device), 0) != []:
-        # HF2 without the MOD Option has an empty MODS branch.
-        settings.append(["/{}/mods/*/enable".format(device), 0])
-    if "outputpwas" in (node.lower() for node in node_branches):
-        settings.append(["/{}/outputpwas/*/enable".format(device), 0])
-    if daq.listNodes("/{}/pids/0/enable".format(device), 0) != []:
-        # HF2 without the PID Option has an empty PID branch.
-        settings.append(["/{}/pids/*/enable".format(device), 0])
-    if daq.listNodes("/{}/plls/0/enable".format(device), 0) != []:
-        # HF2 without the PLL Option still has the PLLS branch.
-        settings.append(["/{}/plls/*/enable".format(device), 0])
-    if "sigins" in (node.lower() for node in node_branches):
-        settings.append(["/{}/sigins/*/ac".format(device), 0])
-        settings.append(["/{}/sigins/*/imp50".format(device), 0])
-        sigins_children = daq.listNodes("/{}/sigins/0/".format(device), 0)
-        for leaf in ["diff", "float"]:
-            if leaf in (node.lower() for node in sigins_children):
-                settings.append(["/{}/sigins/*/{}".format(device, leaf.lower()), 0])
-    if "sigouts" in (node.lower() for node in node_branches):
-        settings.append(["/{}/sigouts/*/on".format(device), 0])
-        settings.append(["/{}/sigouts/*/enables/*".format(device), 0])
-        settings.append(["/{}/sigouts/*/offset".format(device), 0.0])
-        sigouts_children = daq.listNodes("/{}/sigouts/0/".format(device), 0)
-        for leaf in ["add", "diff", "imp50"]:
-            if leaf in (node.lower() for node in sigouts_children):
-                settings.append(["/{}/sigouts/*/{}".format(device, leaf.lower()), 0])
-        if "precompensation" in (node.lower() for node in sigouts_children):
-            settings.append(["/{}/sigouts/*/precompensation/enable".format(device), 0])
-            settings.append(
-                ["/{}/sigouts/*/precompensation/highpass/*/enable".format(device), 0]
-            )
-            settings.append(
-                [
-                    "/{}/sigouts/*/precompensation/exponentials/*/enable".format(
-                        device
-                    ),
-                    0,
-                ]
-            )
-            settings.append(
-                ["/{}/sigouts/*/precompensation/bounces/*/enable".format(device), 0]
-            )
-            settings.append(
-                ["/{}/sigouts/*/precompensation/fir/enable".format(device), 0]
-            )
-    if "scopes" in (node.lower() for node in node_branches):
-        settings.append(["/{}/scopes/*/enable".format(device), 0])
-        if daq.listNodes("/{}/scopes/0/segments/enable".format(device), 0) != []:
-            settings.append(["/{}/scopes/*/segments/enable".format(device), 0])
-        if daq.listNodes("/{}/scopes/0/stream/enables/0".format(device), 0) != []:
-            settings.append(["/{}/scopes/*/stream/enables/*".format(device), 0])
-    if "triggers" in (node.lower() for node in node_branches):
-        settings.append(["/{}/triggers/out/*/drive".format(device), 0])
+    node_branches = {node.lower() for node in node_branches}
+    # Lowercase child names per listed parent node.
+    children: t.Dict[str, t.Set[str]] = {}
+
+    def has_node(path: str) -> bool:
+        parent, _, name = path.rpartition("/")
+        if parent not in children:
+            children[parent] = {
+                node.lower() for node in daq.listNodes(prefix + parent + "/", 0)
+            }
+        return name in children[parent]
+
+    for path, value, required_node in _DISABLE_EVERYTHING_SETTINGS:
+        if path.partition("/")[0] in node_branches and (
+            required_node is None or has_node(required_node)
+        ):
+            settings.append([prefix + path, value])
 
     try:
         daq.set(settings)
@@ -1199,6 +1325,25 @@ def disable_everything(daq: zi.ziDAQServer, device: str) -> t.List[t.Tuple[str,
     return settings
 
 
+# Full scale of the signed 16 bit AWG waveform samples.
+_AWG_WAVEFORM_SCALE = np.power(2, 15) - 1
+
+
+def _uint16_waveform(wave: np.ndarray) -> np.ndarray:
+    """Convert a floating point (range -1 to 1) or integer waveform to uint16.
+
+    Floating point values outside of the range saturate at full scale.
+    """
+    wave = np.asarray(wave)
+    if np.issubdtype(wave.dtype, np.floating):
+        scaled = _AWG_WAVEFORM_SCALE * wave
+        np.clip(scaled, -32768.0, 32767.0, out=scaled)
+        # Casting negative floats to uint16 directly is platform dependent,
+        # int16 has the same bits.
+        return scaled.astype(np.int16).view(np.uint16)
+    return np.asarray(wave, dtype=np.uint16)
+
+
 def convert_awg_waveform(
     wave1: np.ndarray,
     wave2: t.Optional[np.ndarray] = None,
@@ -1210,7 +1355,8 @@ def convert_awg_waveform(
     waveform format (interleaved waves and markers as uint16).
 
     Waveform data can be provided as integer (no conversion) or floating point
-    (range -1 to 1) arrays.
+    (range -1 to 1) arrays. Floating point values outside of that range are
+    clipped to full scale.
 
     Args:
       wave1: Array with data of waveform 1.
@@ -1219,20 +1365,14 @@ def convert_awg_waveform(
 
     Returns:
       The converted uint16 waveform is returned.
-    """
-    wave2_uint = None
-    marker_uint = None
-    mode = 0
 
-    # Prepare waveforms
-    def uint16_waveform(wave):
-        wave = np.asarray(wave)
-        if np.issubdtype(wave.dtype, np.floating):
-            return np.asarray((np.power(2, 15) - 1) * wave, dtype=np.uint16)
-        return np.asarray(wave, dtype=np.uint16)
+    .. versionchanged:: 0.5
 
-    wave1_uint = uint16_waveform(wave1)
-    mode += 1
+        Floating point values outside of the range -1 to 1 are clipped instead
+        of wrapping around.
+    """
+    # Prepare waveforms
+    waves = [_uint16_waveform(wave1)]
 
     if wave2 is not None:
         if len(wave2) != len(wave1):
@@ -1240,8 +1380,7 @@ def convert_awg_waveform(
                 "wave1 and wave2 have different length. They should have the same "
                 "length."
             )
-        wave2_uint = uint16_waveform(wave2)
-        mode += 2
+        waves.append(_uint16_waveform(wave2))
 
     if markers is not None:
         if len(markers) != len(wave1):
@@ -1249,31 +1388,20 @@ def convert_awg_waveform(
                 "wave1 and marker have different length. They should have the same "
                 "length."
             )
-        marker_uint = np.array(markers, dtype=np.uint16)
-        mode += 4
-
-    # Merge waveforms
-    waveform_data = None
-    if mode == 1:
-        waveform_data = wave1_uint
-    elif mode == 3:
-        waveform_data = np.vstack((wave1_uint, wave2_uint)).reshape((-2,), order="F")
-    elif mode == 4:
-        waveform_data = marker_uint
-    elif mode == 5:
-        waveform_data = np.vstack((wave1_uint, marker_uint)).reshape((-2,), order="F")
-    elif mode == 6:
-        waveform_data = np.vstack((wave2_uint, marker_uint)).reshape((-2,), order="F")
-    elif mode == 7:
-        waveform_data = np.vstack((wave1_uint, wave2_uint, marker_uint)).reshape(
-            (-2,), order="F"
-        )
-    else:
-        waveform_data = []
-
+        waves.append(np.asarray(markers, dtype=np.uint16))
+
+    if len(waves) == 1:
+        return waves[0]
+    # Merge waveforms by writing them interleaved into the output directly
+    waveform_data = np.empty(len(waves) * len(waves[0]), dtype=np.uint16)
+    for index, wave in enumerate(waves):
+        waveform_data[index :: len(waves)] = wave  # noqa: E203
     return waveform_data
 
 
+_ParsedWaves = namedtuple("deinterleaved_waves", ["wave1", "wave2", "markers"])
+
+
 def parse_awg_waveform(
     wave_uint: np.ndarray, channels: int = 1, markers_present: bool = False
 ) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
@@ -1292,12 +1420,13 @@ def parse_awg_waveform(
       Three separated arrays are returned. The waveforms are scaled to be in the
       range [-1 and 1]. If no data is present the respective array is empty.
     """
-    from collections import namedtuple
-
     # convert uint16 to int16
-    wave_int = np.array(wave_uint, dtype=np.int16)
-
-    parsed_waves = namedtuple("deinterleaved_waves", ["wave1", "wave2", "markers"])
+    wave_uint = np.asarray(wave_uint)
+    if wave_uint.dtype == np.uint16:
+        # Same bits, the waves are copied by the scaling below anyway.
+        wave_int = wave_uint.view(np.int16)
+    else:
+        wave_int = np.array(wave_uint, dtype=np.int16)
 
     wave1 = []
     wave2 = []
@@ -1311,17 +1440,17 @@ def parse_awg_waveform(
         wave_int[idx::interleaved_frames] for idx in range(interleaved_frames)
     ]
 
-    deinterleaved[0] = deinterleaved[0] / (np.power(2, 15) - 1)
+    deinterleaved[0] = deinterleaved[0] / _AWG_WAVEFORM_SCALE
     if channels == 2:
-        deinterleaved[1] = deinterleaved[1] / (np.power(2, 15) - 1)
+        deinterleaved[1] = deinterleaved[1] / _AWG_WAVEFORM_SCALE
 
     wave1 = deinterleaved[0]
     if channels == 2:
         wave2 = deinterleaved[1]
     if markers_present:
-        markers = deinterleaved[-1]
+        markers = np.array(deinterleaved[-1])
 
-    return parsed_waves(wave1, wave2, markers)
+    return _ParsedWaves(wave1, wave2, markers)
 
 
 def wait_for_state_change(
@@ -1346,10 +1475,12 @@ def wait_for_state_change(
         TimeoutError: If the node did not changed to the expected value within
             the given time.
     """
-    start_time = time.time()
-    while start_time + timeout >= time.time() and daq.getInt(node) != value:
+    deadline = time.monotonic() + timeout
+    current_value = daq.getInt(node)
+    while current_value != value and time.monotonic() <= deadline:
         time.sleep(sleep_time)
-    if daq.getInt(node) != value:
+        current_value = daq.getInt(node)
+    if current_value != value:
         raise TimeoutError(
             f"{node} did not change to expected value {value} within "
             f"{timeout} seconds."
@@ -1411,4 +1542,210 @@ def volt_rms_to_dbm(
     Returns:
       The power in dBm corresponding to the volt_rms argument is returned.
     """
-    return 10 * np.log10((np.abs(volt_rms) ** 2) * 1e3 / input_impedance_ohm)
+    # 10 * log10(|V|^2 * 1e3 / Z) without squaring the whole array.
+    return 20 * np.log10(np.abs(volt_rms)) + 10 * np.log10(1e3 / input_impedance_ohm)
+
+
+async def wait_for_state_change_async(
+    daq: zi.ziDAQServer,
+    node: str,
+    value: int,
+    timeout: float = 1.0,
+    sleep_time: float = 0.005,
+) -> None:
+    """Waits until a node has the expected state/value without blocking.
+
+    Same as wait_for_state_change but yields to the asyncio event loop while
+    waiting, so that other tasks can run in the meantime. The node itself is
+    read with short blocking requests on the event loop thread, since an API
+    session must not be used from several threads at once.
+
+    Attention: Only supports integer values as reference.
+
+    Args:
+        daq: A core API session.
+        node: Path of the node.
+        value: expected value.
+        timeout: max in seconds. (default = 1.0)
+        sleep_time: sleep interval in seconds. (default = 0.005)
+
+    Raises:
+        TimeoutError: If the node did not changed to the expected value within
+            the given time.
+
+    .. versionadded:: 0.5
+    """
+    deadline = time.monotonic() + timeout
+    current_value = daq.getInt(node)
+    while current_value != value and time.monotonic() <= deadline:
+        await asyncio.sleep(sleep_time)
+        current_value = daq.getInt(node)
+    if current_value != value:
+        raise TimeoutError(
+            f"{node} did not change to expected value {value} within "
+            f"{timeout} seconds."
+        )
+
+
+# Device type and options per (API session, device), see get_device_features().
+_DEVICE_FEATURES_CACHE: t.Dict[t.Tuple[int, str], t.Tuple[str, str]] = {}
+# Version and revision of the Data Server per API session, see
+# api_server_version_check().
+_SERVER_ABOUT_CACHE: t.Dict[t.Tuple[int], t.Tuple[str, int]] = {}
+# All caches of static device information, see clear_device_feature_cache().
+_DEVICE_CACHES: t.List[dict] = [_DEVICE_FEATURES_CACHE, _SERVER_ABOUT_CACHE]
+# deviceSettings module per API session, see _execute_device_settings().
+_DEVICE_SETTINGS_MODULES: t.Dict[t.Tuple[int], t.Any] = {}
+# API sessions with entries in the caches, see _session_key().
+_SESSIONS: t.Set[int] = set()
+
+
+def _session_key(daq: zi.ziDAQServer) -> int:
+    """Return the key of an API session for the per session caches.
+
+    The entries of a session are dropped once the session is garbage
+    collected, so that a new session reusing its id does not see them.
+    """
+    key = id(daq)
+    if key not in _SESSIONS:
+        try:
+            weakref.finalize(daq, _forget_session, key)
+        except TypeError:
+            # Without weak references the entries are kept until cleared.
+            pass
+        _SESSIONS.add(key)
+    return key
+
+
+def _forget_session(key: int) -> None:
+    """Drop all cache entries of a garbage collected API session."""
+    _SESSIONS.discard(key)
+    for cache in (*_DEVICE_CACHES, _UPLOAD_DIGESTS, _DEVICE_SETTINGS_MODULES):
+        for entry in [entry for entry in cache if entry[0] == key]:
+            del cache[entry]
+
+
+def get_device_features(daq: zi.ziDAQServer, device_id: str) -> t.Tuple[str, str]:
+    """Return the device type and the installed options of a device.
+
+    The values do not change while a device is connected. They are therefore
+    only fetched once per API session and device from the Data Server and
+    served from a cache afterwards.
+
+    Args:
+      daq: A core API session.
+      device_id: The device ID, e.g. 'dev12004'.
+
+    Returns:
+      The device type and the options of the device as reported by the
+      ``features/devtype`` and ``features/options`` nodes.
+
+    .. versionadded:: 0.5
+    """
+    device_id = device_id.lower()
+    key = (_session_key(daq), device_id)
+    features = _DEVICE_FEATURES_CACHE.get(key)
+    if features is None:
+        features_path = f"/{device_id}/features/"
+        data = daq.get(
+            features_path + "devtype," + features_path + "options", flat=True
+        )
+        features = (
+            data[features_path + "devtype"]["value"][0],
+            data[features_path + "options"]["value"][0],
+        )
+        _DEVICE_FEATURES_CACHE[key] = features
+    return features
+
+
+def clear_device_feature_cache() -> None:
+    """Clear the caches of static device information.
+
+    This includes the caches used by get_device_features and
+    api_server_version_check. Needs to be called if the options of a device
+    changed while connected.
+
+    .. versionadded:: 0.5
+    """
+    for cache in _DEVICE_CACHES:
+        cache.clear()
+
+
+# Digest of the data last uploaded per (API session, node), see _is_uploaded().
+_UPLOAD_DIGESTS: t.Dict[t.Tuple[int, str], bytes] = {}
+
+
+def _upload_digest(data: t.Union[str, bytes]) -> bytes:
+    """Return a short digest identifying the content of an upload."""
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _is_uploaded(daq: zi.ziDAQServer, node: str, digest: bytes) -> bool:
+    """Check if the data with the given digest was the last upload to a node."""
+    return _UPLOAD_DIGESTS.get((_session_key(daq), node.lower())) == digest
+
+
+def _set_uploaded(
+    daq: zi.ziDAQServer, node: str, digest: t.Optional[bytes] = None
+) -> None:
+    """Remember the digest of the last upload to a node, None forgets it."""
+    key = (_session_key(daq), node.lower())
+    if digest is None:
+        _UPLOAD_DIGESTS.pop(key, None)
+    else:
+        _UPLOAD_DIGESTS[key] = digest
+
+
+def clear_upload_cache() -> None:
+    """Forget which data was uploaded to the devices.
+
+    Subsequent uploads with ``skip_unchanged`` enabled are always performed and
+    sequencer programs are compiled again. Needs to be called if the uploaded
+    data was changed outside of zhinst.utils, e.g. by another API session or a
+    device reboot, or if a waveform file used by a sequencer program changed.
+
+    .. versionadded:: 0.5
+    """
+    _UPLOAD_DIGESTS.clear()
+    _compile_seqc_cached.cache_clear()
+
+
+def _compile_seqc(
+    sequencer_program: str,
+    device_type: str,
+    device_options: str,
+    index: int,
+    sequencer: str,
+    *,
+    cached: bool = False,
+) -> bytes:
+    """Compile a sequencer program.
+
+    With ``cached`` enabled the result of an identical previous call is reused.
+    Changes to waveform files or includes referenced by the program are not
+    detected in that case, see clear_upload_cache.
+    """
+    if cached:
+        return _compile_seqc_cached(
+            sequencer_program, device_type, device_options, index, sequencer
+        )
+    elf, _ = zi.compile_seqc(
+        sequencer_program, device_type, device_options, index, sequencer=sequencer
+    )
+    return elf
+
+
+@lru_cache(maxsize=128)
+def _compile_seqc_cached(
+    sequencer_program: str,
+    device_type: str,
+    device_options: str,
+    index: int,
+    sequencer: str,
+) -> bytes:
+    """Compile a sequencer program, reusing the result of identical calls."""
+    return _compile_seqc(
+        sequencer_program, device_type, device_options, index, sequencer
+    )
@@ -1,7 +1,10 @@
 from unittest.mock import MagicMock
 
+import pytest
+
 from zhinst.utils.auto_generate_functions import (
     _cut_section_out,
+    batched_config,
     build_docstring_configure,
     configure_maker,
 )
@@ -135,3 +138,37 @@ def test_configure_maker():
     daq = MagicMock()
     configure_func(daq, 5, kwarg1=3)
     daq.set.assert_called_once_with([("setting1", 8)])
+
+
+def test_batched_config():
+    def get_settings(arg1: int):
+        """simple settings function"""
+        return [(f"setting{arg1}", arg1)]
+
+    configure_func = configure_maker(get_settings, lambda x: x)
+
+    daq = MagicMock()
+    other_daq = MagicMock()
+    with batched_config(daq) as settings:
+        configure_func(daq, 1)
+        with batched_config(daq):
+            configure_func(daq, 2)
+        configure_func(other_daq, 3)
+        daq.set.assert_not_called()
+        assert settings == [("setting1", 1), ("setting2", 2)]
+    daq.set.assert_called_once_with([("setting1", 1), ("setting2", 2)])
+    other_daq.set.assert_called_once_with([("setting3", 3)])
+
+    configure_func(daq, 4)
+    daq.set.assert_called_with([("setting4", 4)])
+
+
+def test_batched_config_exception():
+    configure_func = configure_maker(lambda: [("setting", 1)], lambda x: x)
+
+    daq = MagicMock()
+    with pytest.raises(RuntimeError):
+        with batched_config(daq):
+            configure_func(daq)
+            raise RuntimeError
+    daq.set.assert_not_called()
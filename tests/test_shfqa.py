@@ -0,0 +1,333 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from zhinst.utils import clear_device_feature_cache, clear_upload_cache, shfqa
+
+
+@pytest.fixture
+def daq():
+    daq = MagicMock()
+    daq.listNodes.return_value = [
+        f"/dev12004/qachannels/0/readout/integration/weights/{i}" for i in range(2)
+    ]
+    yield daq
+    clear_device_feature_cache()
+    clear_upload_cache()
+
+
+def test_write_to_waveform_memory_skips_clear_for_all_slots(daq):
+    shfqa.write_to_waveform_memory(daq, "dev12004", 0, {0: [1j], 1: [1j]})
+    shfqa.write_to_waveform_memory(daq, "dev12004", 0, {0: [1j], 1: [1j]})
+    daq.syncSetInt.assert_not_called()
+    daq.listNodes.assert_called_once()
+    assert daq.set.call_count == 2
+
+
+def test_write_to_waveform_memory_clears_partial_upload(daq):
+    shfqa.write_to_waveform_memory(daq, "dev12004", 1, {0: [1j]})
+    daq.syncSetInt.assert_called_once_with(
+        "/dev12004/qachannels/1/generator/clearwave", 1
+    )
+
+
+def test_write_to_waveform_memory_clears_unused_generator_slots(daq):
+    daq.listNodes.return_value = [
+        f"/dev12004/qachannels/0/generator/waveforms/{i}" for i in range(4)
+    ]
+    shfqa.write_to_waveform_memory(daq, "dev12004", 0, {0: [1j], 1: [1j]})
+    daq.listNodes.assert_called_once_with(
+        "/dev12004/qachannels/0/generator/waveforms"
+    )
+    daq.syncSetInt.assert_called_once_with(
+        "/dev12004/qachannels/0/generator/clearwave", 1
+    )
+
+
+def test_write_to_waveform_memory_without_smart_clear(daq):
+    shfqa.write_to_waveform_memory(
+        daq, "dev12004", 0, {0: [1j], 1: [1j]}, smart_clear=False
+    )
+    daq.syncSetInt.assert_called_once()
+    daq.listNodes.assert_not_called()
+
+
+def test_get_result_logger_data(daq):
+    daq.getInt.return_value = 0
+    daq.get.return_value = {
+        f"/dev12004/qachannels/0/readout/result/data/{i}/wave": [
+            {"vector": np.full(3, i, dtype=np.complex128)}
+        ]
+        for i in range(2)
+    }
+    result = shfqa.get_result_logger_data(daq, "dev12004", 0, mode="readout")
+    daq.getInt.assert_called_once_with("/dev12004/qachannels/0/readout/result/enable")
+    daq.get.assert_called_once_with(
+        "/dev12004/qachannels/0/readout/result/data/*/wave", flat=True
+    )
+    assert result.dtype == np.complex128
+    np.testing.assert_array_equal(result, [[0, 0, 0], [1, 1, 1]])
+
+
+def test_get_scope_settings():
+    settings = shfqa.get_scope_settings(
+        "dev12004",
+        input_select={0: "channel0_signal_input", 1: "channel1_signal_input"},
+        num_samples=1024,
+        trigger_input="channel0_sequencer_monitor0",
+    )
+    assert settings == [
+        ("/dev12004/scopes/0/segments/count", 1),
+        ("/dev12004/scopes/0/segments/enable", 0),
+        ("/dev12004/scopes/0/averaging/enable", 0),
+        ("/dev12004/scopes/0/averaging/count", 1),
+        ("/dev12004/scopes/0/channels/*/enable", 0),
+        ("/dev12004/scopes/0/channels/0/inputselect", "channel0_signal_input"),
+        ("/dev12004/scopes/0/channels/0/enable", 1),
+        ("/dev12004/scopes/0/channels/1/inputselect", "channel1_signal_input"),
+        ("/dev12004/scopes/0/channels/1/enable", 1),
+        ("/dev12004/scopes/0/trigger/delay", 0.0),
+        ("/dev12004/scopes/0/trigger/channel", "channel0_sequencer_monitor0"),
+        ("/dev12004/scopes/0/trigger/enable", 1),
+        ("/dev12004/scopes/0/length", 1024),
+    ]
+
+
+def test_get_scope_settings_sets_trigger_once():
+    settings = shfqa.get_scope_settings(
+        "dev12004",
+        input_select={i: f"channel{i}_signal_input" for i in range(4)},
+        num_samples=1024,
+        trigger_input=None,
+    )
+    paths = [path for path, _ in settings]
+    assert paths.count("/dev12004/scopes/0/trigger/delay") == 1
+    assert paths.count("/dev12004/scopes/0/trigger/enable") == 1
+    assert "/dev12004/scopes/0/trigger/channel" not in paths
+    assert ("/dev12004/scopes/0/trigger/enable", 0) in settings
+
+
+def test_get_scope_data(daq):
+    scope_path = "/dev12004/scopes/0/"
+    wave = {
+        "vector": np.arange(4, dtype=np.complex64),
+        "properties": {"averagecount": 2, "scaling": 0.5},
+    }
+    daq.getInt.return_value = 0
+    daq.get.side_effect = [
+        {
+            **{
+                scope_path + f"channels/{i}/enable": {"value": [int(i == 1)]}
+                for i in range(4)
+            },
+            scope_path + "time": {"value": [0]},
+        },
+        {scope_path + "channels/1/wave": [wave]},
+    ]
+    scope_data = shfqa.get_scope_data(daq, "DEV12004")
+    recorded_data, recorded_data_range, scope_time = scope_data
+    assert isinstance(scope_data, shfqa.ScopeData)
+    assert recorded_data[0] == []
+    np.testing.assert_array_equal(recorded_data[1], np.arange(4))
+    np.testing.assert_array_equal(recorded_data_range, [0.0, 2**13, 0.0, 0.0])
+    np.testing.assert_allclose(scope_time[1], np.arange(4) / 2e9)
+    assert len(scope_time[0]) == 0
+
+
+def test_configure_weighted_integration_length():
+    settings = shfqa.get_configure_weighted_integration_settings(
+        "dev12004", 0, weights={0: np.ones(8), 1: np.ones(8)}
+    )
+    assert ("/dev12004/qachannels/0/readout/integration/length", 8) in settings
+    with pytest.raises(ValueError):
+        shfqa.get_configure_weighted_integration_settings(
+            "dev12004", 0, weights={0: np.ones(8), 1: np.ones(4)}
+        )
+    settings = shfqa.get_configure_weighted_integration_settings(
+        "dev12004", 0, weights={0: np.ones(8), 1: np.ones(4)}, integration_length=6
+    )
+    assert ("/dev12004/qachannels/0/readout/integration/length", 6) in settings
+
+
+def test_get_scope_data_async(daq):
+    daq.getInt.side_effect = [1, 0]
+    scope_nodes = {
+        **{
+            f"/dev12004/scopes/0/channels/{i}/enable": {"value": [0]}
+            for i in range(4)
+        },
+        "/dev12004/scopes/0/time": {"value": [0]},
+    }
+    request_threads = set()
+
+    def get(*args, **kwargs):
+        request_threads.add(threading.get_ident())
+        return scope_nodes
+
+    daq.get.side_effect = get
+    scope_data = asyncio.run(shfqa.get_scope_data_async(daq, "dev12004"))
+    assert scope_data.recorded_data == [[], [], [], []]
+    # the scope is only waited for once
+    assert daq.getInt.call_count == 2
+    # the session is only used from the event loop thread
+    assert request_threads == {threading.get_ident()}
+
+
+@pytest.mark.parametrize("mode", ["spectroscopy", "readout"])
+def test_configure_result_logger_docstring(mode):
+    configure = getattr(shfqa, f"configure_result_logger_for_{mode}")
+    assert configure.__doc__.startswith(
+        f"Configures a specified result logger for {mode} mode.\n\n"
+    )
+    assert "Args:" in configure.__doc__
+
+
+def test_enable_scope(daq):
+    # The scope of a previous acquisition may still be running, which is also
+    # acknowledged with 1.
+    daq.syncSetInt.return_value = 1
+    shfqa.enable_scope(daq, "dev12004", single=1)
+    daq.getInt.assert_not_called()
+    assert daq.method_calls == [
+        ("setInt", ("/dev12004/scopes/0/single", 1), {}),
+        ("setInt", ("/dev12004/scopes/0/enable", 0), {}),
+        ("syncSetInt", ("/dev12004/scopes/0/enable", 1), {}),
+    ]
+    daq.syncSetInt.return_value = 0
+    with pytest.raises(RuntimeError):
+        shfqa.enable_scope(daq, "dev12004", single=1)
+
+
+def test_enable_result_logger_resets_running_logger(daq):
+    daq.syncSetInt.return_value = 1
+    shfqa.enable_result_logger(daq, "dev12004", 0, mode="readout")
+    path = "/dev12004/qachannels/0/readout/result/enable"
+    assert daq.method_calls == [
+        ("setInt", (path, 0), {}),
+        ("syncSetInt", (path, 1), {}),
+    ]
+
+
+def test_max_qubits_per_channel_is_cached(daq):
+    assert shfqa.max_qubits_per_channel(daq, "dev12004") == 2
+    assert shfqa.max_qubits_per_channel(daq, "DEV12004") == 2
+    daq.listNodes.assert_called_once_with(
+        "/dev12004/qachannels/0/readout/integration/weights"
+    )
+    assert shfqa.max_qubits_per_channel(MagicMock(), "dev12004") != 2
+    clear_device_feature_cache()
+    shfqa.max_qubits_per_channel(daq, "dev12004")
+    assert daq.listNodes.call_count == 2
+
+
+def test_write_to_waveform_memory_single_precision(daq):
+    shfqa.write_to_waveform_memory(
+        daq, "dev12004", 0, {0: np.ones(4, dtype=np.complex128)}, clear_existing=False
+    )
+    ((_, waveform),) = daq.set.call_args[0][0]
+    assert waveform.dtype == np.complex64
+    np.testing.assert_array_equal(waveform, np.ones(4))
+
+
+def test_get_result_logger_data_single_vector(daq):
+    vector = np.arange(3, dtype=np.complex128)
+    daq.getInt.return_value = 0
+    daq.get.return_value = {
+        "/dev12004/qachannels/0/readout/result/data/0/wave": [{"vector": vector}]
+    }
+    result = shfqa.get_result_logger_data(daq, "dev12004", 0, mode="readout")
+    assert result.shape == (1, 3)
+    assert np.shares_memory(result, vector)
+
+
+@patch("zhinst.core.compile_seqc", autospec=True)
+def test_load_sequencer_program_skip_unchanged(compile_seqc, daq):
+    compile_seqc.side_effect = lambda program, *args, **kwargs: (program.encode(), {})
+    daq.get.return_value = {
+        "/dev12004/features/devtype": {"value": ["SHFQA4"]},
+        "/dev12004/features/options": {"value": [""]},
+    }
+    daq.getInt.return_value = 1
+    for _ in range(2):
+        shfqa.load_sequencer_program(
+            daq, "dev12004", 0, "wait(1);", skip_unchanged=True
+        )
+    assert daq.set.call_count == 1
+    shfqa.load_sequencer_program(daq, "dev12004", 0, "wait(2);", skip_unchanged=True)
+    assert daq.set.call_count == 2
+    clear_upload_cache()
+    shfqa.load_sequencer_program(daq, "dev12004", 0, "wait(2);", skip_unchanged=True)
+    assert daq.set.call_count == 3
+
+
+@patch("zhinst.core.compile_seqc", autospec=True)
+def test_load_sequencer_program_skip_identical_elf(compile_seqc, daq):
+    compile_seqc.return_value = (b"elf", {})
+    daq.getInt.return_value = 1
+    for program in ("wait(1);", "wait(1); // same binary"):
+        shfqa.load_sequencer_program(daq, "dev12004", 0, program, skip_unchanged=True)
+    assert compile_seqc.call_count == 2
+    assert daq.set.call_count == 1
+
+
+def test_write_to_waveform_memory_converts_shared_waveform_once(daq):
+    waveform = np.ones(4)
+    shfqa.write_to_waveform_memory_multi(
+        daq, "dev12004", {0: {0: waveform, 1: waveform}, 1: {0: waveform}}
+    )
+    waves = [wave for _, wave in daq.set.call_args[0][0]]
+    assert len(waves) == 3
+    assert waves[0] is waves[1] is waves[2]
+
+
+@pytest.mark.parametrize("mode", ["readout", "READOUT", shfqa.Mode.READOUT, 1])
+def test_enable_result_logger_mode(daq, mode):
+    daq.syncSetInt.return_value = 1
+    shfqa.enable_result_logger(daq, "dev12004", 0, mode=mode)
+    daq.syncSetInt.assert_called_once_with(
+        "/dev12004/qachannels/0/readout/result/enable", 1
+    )
+
+
+def test_enable_result_logger_invalid_mode(daq):
+    with pytest.raises(ValueError):
+        shfqa.enable_result_logger(daq, "dev12004", 0, mode="readin")
+    daq.syncSetInt.assert_not_called()
+
+
+@patch("zhinst.utils.shfqa.shfqa.time", autospec=True)
+def test_start_continuous_sw_trigger_does_not_drift(time_mock, daq):
+    # Every trigger takes 5 ms to be issued.
+    time_mock.monotonic.side_effect = [0.0, 0.025, 0.05, 0.075]
+    shfqa.start_continuous_sw_trigger(daq, "dev12004", num_triggers=3, wait_time=0.03)
+    assert daq.setInt.call_count == 3
+    sleeps = [call[0][0] for call in time_mock.sleep.call_args_list]
+    assert sleeps == pytest.approx([0.005, 0.01, 0.015])
+    daq.sync.assert_called_once()
+
+
+def test_configure_weighted_integration_order():
+    settings = shfqa.get_configure_weighted_integration_settings(
+        "dev12004", 0, weights={2: np.ones(4), 0: np.ones(4), 1: [1j] * 4}
+    )
+    weights = [(path, value) for path, value in settings if path.endswith("/wave")]
+    assert [path.split("/")[-2] for path, _ in weights] == ["0", "1", "2"]
+    assert all(value.dtype == np.complex64 for _, value in weights)
+
+
+@patch("zhinst.utils.shfqa.shfqa.time.sleep")
+def test_enable_sequencer_does_not_sleep(sleep, daq):
+    daq.syncSetInt.return_value = 1
+    shfqa.enable_sequencer(daq, "dev12004", 0, single=1)
+    sleep.assert_not_called()
+    daq.getInt.assert_not_called()
+    daq.setInt.assert_called_once_with("/dev12004/qachannels/0/generator/single", 1)
+    daq.syncSetInt.assert_called_once_with(
+        "/dev12004/qachannels/0/generator/enable", 1
+    )
+    daq.syncSetInt.return_value = 0
+    with pytest.raises(RuntimeError):
+        shfqa.enable_sequencer(daq, "dev12004", 0, single=1)
@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from zhinst.utils import clear_device_feature_cache, shfqc
+
+
+def test_configure_channels():
+    daq = MagicMock()
+    shfqc.configure_channels(
+        daq,
+        "dev12004",
+        qa_channel={
+            "input_range": 0,
+            "output_range": 0,
+            "center_frequency": 5e9,
+            "mode": "readout",
+        },
+        sg_channels={
+            i: {
+                "enable": 1,
+                "output_range": 0,
+                "center_frequency": 1e9,
+                "rflf_path": 0,
+            }
+            for i in range(2)
+        },
+    )
+    daq.set.assert_called_once()
+    paths = [path for path, _ in daq.set.call_args[0][0]]
+    assert "/dev12004/qachannels/0/input/range" in paths
+    assert "/dev12004/sgchannels/0/output/on" in paths
+    assert "/dev12004/sgchannels/1/output/on" in paths
+
+
+def test_invalid_channel_type():
+    with pytest.raises(ValueError, match='only "qa" and "sg" are allowed'):
+        shfqc.load_sequencer_program(MagicMock(), "dev12004", 0, "", channel_type="qc")
+
+
+def test_max_qubits_per_qa_channel_is_cached():
+    daq = MagicMock()
+    daq.listNodes.return_value = ["0", "1", "2", "3"]
+    for _ in range(3):
+        assert shfqc.max_qubits_per_qa_channel(daq, "dev12004") == 4
+    daq.listNodes.assert_called_once()
+    clear_device_feature_cache()
@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import patch
 import zhinst.utils.shfqc as shfqc
 import inspect
@@ -79,7 +80,10 @@ def test_shfqc_consistency():
             with patch("zhinst.utils.shfqc.shfqc.shfqa", autospec=True) as shfqa, patch(
                 "zhinst.utils.shfqc.shfqc.shfsg", autospec=True
             ) as shfsg:
-                function(**kwargs)
+                result = function(**kwargs)
+                # Async functions only call SHFQA/SHFSG once they are awaited
+                if inspect.iscoroutine(result):
+                    asyncio.run(result)
                 if len(shfqa.method_calls) > 0:
                     shfqa_function_names.remove(shfqa.method_calls[0][0])
                 if len(shfsg.method_calls) > 0:
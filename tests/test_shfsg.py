@@ -0,0 +1,246 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from zhinst.utils import (
+    batched_config,
+    clear_device_feature_cache,
+    clear_upload_cache,
+    shfsg,
+)
+
+
+@pytest.fixture
+def daq():
+    daq = MagicMock()
+    yield daq
+    clear_device_feature_cache()
+    clear_upload_cache()
+
+
+def test_configure_channels_batched(daq):
+    with batched_config(daq):
+        for channel_index in range(2):
+            shfsg.configure_channel(
+                daq,
+                "dev12004",
+                channel_index,
+                enable=1,
+                output_range=0,
+                center_frequency=1e9,
+                rflf_path=0,
+            )
+            shfsg.configure_marker_and_trigger(
+                daq,
+                "dev12004",
+                channel_index,
+                trigger_in_source="trigin0",
+                trigger_in_slope="rising_edge",
+                marker_out_source="awg_trigger0",
+            )
+        daq.set.assert_not_called()
+    daq.set.assert_called_once()
+    paths = [path for path, _ in daq.set.call_args[0][0]]
+    assert "/dev12004/sgchannels/1/output/on" in paths
+    assert "/dev12004/sgchannels/1/marker/source" in paths
+
+
+@patch("zhinst.core.compile_seqc", autospec=True)
+def test_load_sequencer_program_reads_features_once(compile_seqc, daq):
+    compile_seqc.return_value = (b"elf", {})
+    daq.get.return_value = {
+        "/dev12004/features/devtype": {"value": ["SHFSG8"]},
+        "/dev12004/features/options": {"value": ["RTR"]},
+    }
+    daq.getInt.return_value = 1
+    for program in ("wait(1);", "wait(2);"):
+        shfsg.load_sequencer_program(daq, "dev12004", 1, program)
+    daq.getString.assert_not_called()
+    daq.get.assert_any_call(
+        "/dev12004/features/devtype,/dev12004/features/options", flat=True
+    )
+    compile_seqc.assert_called_with("wait(2);", "SHFSG8", "RTR", 1, sequencer="sg")
+
+
+@patch("zhinst.core.compile_seqc", autospec=True)
+def test_load_sequencer_program_compiles_once(compile_seqc, daq):
+    compile_seqc.return_value = (b"elf", {})
+    daq.get.return_value = {
+        "/dev12004/features/devtype": {"value": ["SHFSG8"]},
+        "/dev12004/features/options": {"value": [""]},
+    }
+    daq.getInt.return_value = 1
+    # Without skip_unchanged the program is always compiled and uploaded.
+    for _ in range(2):
+        shfsg.load_sequencer_program(daq, "dev12004", 0, "wait(1);")
+    assert compile_seqc.call_count == 2
+    assert daq.set.call_count == 2
+    for _ in range(2):
+        shfsg.load_sequencer_program(
+            daq, "dev12004", 0, "wait(1);", skip_unchanged=True
+        )
+    assert compile_seqc.call_count == 3
+    clear_upload_cache()
+    shfsg.load_sequencer_program(daq, "dev12004", 0, "wait(1);", skip_unchanged=True)
+    assert compile_seqc.call_count == 4
+
+
+@patch("zhinst.core.compile_seqc", autospec=True)
+def test_load_sequencer_program_single_transaction(compile_seqc, daq):
+    compile_seqc.return_value = (b"elf", {})
+    daq.getInt.return_value = 1
+    shfsg.load_sequencer_program(daq, "dev12004", 2, "wait(1);")
+    daq.set.assert_called_once_with(
+        [
+            ("/dev12004/sgchannels/2/awg/reset", 1),
+            ("/dev12004/sgchannels/2/awg/elf/data", b"elf"),
+        ]
+    )
+    daq.syncSetInt.assert_not_called()
+    daq.getInt.assert_called_with("/dev12004/sgchannels/2/awg/ready")
+
+
+@patch("zhinst.core.compile_seqc", autospec=True)
+def test_load_sequencer_program_not_ready(compile_seqc, daq):
+    compile_seqc.return_value = (b"elf", {})
+    daq.getInt.return_value = 0
+    with pytest.raises(RuntimeError):
+        shfsg.load_sequencer_program(daq, "dev12004", 0, "wait(1);", timeout=0.01)
+
+
+def test_get_sine_generation_settings_paths():
+    settings = shfsg.get_sine_generation_settings(
+        "dev12004", 3, enable=1, osc_index=2, sine_generator_index=1
+    )
+    paths = [path for path, _ in settings]
+    assert "/dev12004/sgchannels/3/sines/1/i/sin/amplitude" in paths
+    assert "/dev12004/sgchannels/3/oscs/2/freq" in paths
+    settings = shfsg.get_pulse_modulation_settings("dev12004", 3, enable=1)
+    paths = [path for path, _ in settings]
+    assert "/dev12004/sgchannels/3/awg/modulation/enable" in paths
+    assert ("/dev12004/sgchannels/3/awg/outputs/1/gains/0", 1.0) in settings
+    assert "/dev12004/sgchannels/3/oscs/0/freq" in paths
+
+
+def test_configure_channel_caches_synthesizer(daq):
+    daq.getInt.return_value = 2
+    for center_frequency in (1e9, 2e9):
+        shfsg.configure_channel(
+            daq,
+            "dev12004",
+            1,
+            enable=1,
+            output_range=0,
+            center_frequency=center_frequency,
+            rflf_path=1,
+        )
+    daq.getInt.assert_called_once_with("/dev12004/sgchannels/1/synthesizer")
+    assert ("/dev12004/synthesizers/2/centerfreq", 2e9) in daq.set.call_args[0][0]
+
+
+def test_configure_channel_full_single_transaction(daq):
+    shfsg.configure_channel_full(
+        daq,
+        "dev12004",
+        0,
+        channel={
+            "enable": 1,
+            "output_range": 0,
+            "center_frequency": 1e9,
+            "rflf_path": 0,
+        },
+        pulse_modulation={"enable": 1},
+        sine_generation={"enable": 0},
+    )
+    daq.set.assert_called_once()
+    paths = [path for path, _ in daq.set.call_args[0][0]]
+    assert "/dev12004/sgchannels/0/output/on" in paths
+    assert "/dev12004/sgchannels/0/awg/modulation/enable" in paths
+    assert "/dev12004/sgchannels/0/sines/0/i/enable" in paths
+    assert "/dev12004/sgchannels/0/marker/source" not in paths
+
+
+@patch("zhinst.core.compile_seqc", autospec=True)
+def test_upload_commandtable_skip_unchanged(compile_seqc, daq):
+    compile_seqc.return_value = (b"elf", {})
+    path = "/dev12004/sgchannels/0/awg/commandtable/data"
+    for command_table in ('{"table": []}', '{"table": []}', '{"table": [{}]}'):
+        shfsg.upload_commandtable(
+            daq, "dev12004", 0, command_table, skip_unchanged=True
+        )
+    assert daq.setVector.call_count == 2
+    daq.getInt.return_value = 1
+    shfsg.load_sequencer_program(daq, "dev12004", 0, "wait(1);")
+    shfsg.upload_commandtable(daq, "dev12004", 0, command_table, skip_unchanged=True)
+    daq.setVector.assert_called_with(path, command_table)
+    assert daq.setVector.call_count == 3
+
+
+@patch("zhinst.core.compile_seqc", autospec=True)
+def test_load_sequencer_program_async_concurrent(compile_seqc, daq):
+    compile_threads = set()
+
+    def compile_program(*args, **kwargs):
+        compile_threads.add(threading.get_ident())
+        return b"elf", {}
+
+    compile_seqc.side_effect = compile_program
+    ready = {}
+
+    def get_int(path):
+        # Each sequencer becomes ready on the second query.
+        ready[path] = ready.get(path, -1) + 1
+        return ready[path]
+
+    # An API session must not be used from several threads at once, so each
+    # concurrent upload gets its own session.
+    sessions = [MagicMock() for _ in range(4)]
+    for session in sessions:
+        session.getInt.side_effect = get_int
+
+    async def load_all():
+        await asyncio.gather(
+            *(
+                shfsg.load_sequencer_program_async(
+                    session, "dev12004", index, "wait(1);"
+                )
+                for index, session in enumerate(sessions)
+            )
+        )
+
+    asyncio.run(load_all())
+    assert all(session.set.call_count == 1 for session in sessions)
+    # Compiling and uploading run in the executor, not in the event loop thread.
+    assert threading.get_ident() not in compile_threads
+    assert sorted(ready) == [f"/dev12004/sgchannels/{i}/awg/ready" for i in range(4)]
+
+
+def test_configure_channels_single_transaction(daq):
+    shfsg.configure_channels(
+        daq,
+        "dev12004",
+        range(8),
+        marker_and_trigger={
+            "trigger_in_source": "chan0trigin0",
+            "trigger_in_slope": "rising_edge",
+            "marker_out_source": "awg_trigger0",
+        },
+        sine_generation={"enable": 1},
+    )
+    daq.set.assert_called_once()
+    paths = [path for path, _ in daq.set.call_args[0][0]]
+    assert len(paths) == 8 * (3 + 9)
+    assert "/dev12004/sgchannels/7/marker/source" in paths
+
+
+def test_enable_sequencer(daq):
+    daq.syncSetInt.return_value = 1
+    shfsg.enable_sequencer(daq, "dev12004", 1, single=True)
+    daq.setInt.assert_called_once_with("/dev12004/sgchannels/1/awg/single", 1)
+    daq.syncSetInt.assert_called_once_with("/dev12004/sgchannels/1/awg/enable", 1)
+    daq.getInt.assert_not_called()
+    daq.syncSetInt.return_value = 0
+    with pytest.raises(RuntimeError):
+        shfsg.enable_sequencer(daq, "dev12004", 1, single=True)
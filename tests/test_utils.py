@@ -0,0 +1,474 @@
+import datetime
+import gc
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from zhinst.utils import (
+    api_server_version_check,
+    autoDetect,
+    bw2tc,
+    bwtc_scaling_factor,
+    check_for_sampleloss,
+    clear_device_feature_cache,
+    clear_discovery_cache,
+    convert_awg_waveform,
+    create_api_session,
+    default_output_mixer_channel,
+    devices,
+    disable_everything,
+    get_device_features,
+    load_labone_csv,
+    load_labone_demod_csv,
+    load_labone_mat,
+    load_settings,
+    load_zicontrol_csv,
+    load_zicontrol_zibin,
+    parse_awg_waveform,
+    save_settings,
+    systemtime_to_datetime,
+    tc2bw,
+    volt_rms_to_dbm,
+    wait_for_state_change,
+)
+from zhinst.utils import utils
+
+
+@pytest.fixture
+def daq():
+    daq = MagicMock()
+    daq.get.return_value = {
+        "/dev12004/features/devtype": {"value": ["SHFQC"]},
+        "/dev12004/features/options": {"value": ["QC6CH\nPLUS"]},
+    }
+    yield daq
+    clear_device_feature_cache()
+
+
+def test_get_device_features_is_cached(daq):
+    assert get_device_features(daq, "DEV12004") == ("SHFQC", "QC6CH\nPLUS")
+    assert get_device_features(daq, "dev12004") == ("SHFQC", "QC6CH\nPLUS")
+    daq.get.assert_called_once_with(
+        "/dev12004/features/devtype,/dev12004/features/options", flat=True
+    )
+
+
+def test_clear_device_feature_cache(daq):
+    get_device_features(daq, "dev12004")
+    clear_device_feature_cache()
+    get_device_features(daq, "dev12004")
+    assert daq.get.call_count == 2
+
+
+def test_wait_for_state_change_single_query(daq):
+    daq.getInt.return_value = 1
+    wait_for_state_change(daq, "/dev12004/sgchannels/0/awg/ready", 1)
+    daq.getInt.assert_called_once_with("/dev12004/sgchannels/0/awg/ready")
+
+
+def test_wait_for_state_change_polls_until_timeout(daq):
+    daq.getInt.side_effect = [0, 0, 1]
+    wait_for_state_change(daq, "/dev12004/sgchannels/0/awg/ready", 1)
+    assert daq.getInt.call_count == 3
+    daq.getInt.side_effect = None
+    daq.getInt.return_value = 0
+    with pytest.raises(TimeoutError):
+        wait_for_state_change(daq, "/dev12004/sgchannels/0/awg/ready", 1, timeout=0.01)
+
+
+def test_get_device_features_dropped_with_session():
+    daq = MagicMock()
+    daq.get.return_value = {
+        "/dev12004/features/devtype": {"value": ["SHFQC"]},
+        "/dev12004/features/options": {"value": [""]},
+    }
+    get_device_features(daq, "dev12004")
+    assert len(utils._DEVICE_FEATURES_CACHE) == 1
+    del daq
+    gc.collect()
+    assert not utils._DEVICE_FEATURES_CACHE
+
+
+@pytest.mark.parametrize(
+    "device_type, options, output_channel, expected",
+    [
+        ("UHFLI", "", 1, 7),
+        ("UHFAWG", "", 0, 3),
+        ("UHFLI", "MF", 1, 1),
+        ("UHFQA", "", 1, 1),
+        ("HF2LI", "", 0, 6),
+        ("HF2LI", "MF", 0, 0),
+        ("HF2IS", "", 1, 1),
+        ("MFLI", "", 0, 1),
+        ("MFIA", "MD", 0, 0),
+    ],
+)
+def test_default_output_mixer_channel(device_type, options, output_channel, expected):
+    discovery_props = {"devicetype": device_type, "options": options}
+    assert default_output_mixer_channel(discovery_props, output_channel) == expected
+
+
+@pytest.mark.parametrize("device_type", ["UHFLI", "UHFQA", "HF2LI", "MFLI"])
+def test_default_output_mixer_channel_invalid(device_type):
+    with pytest.raises(Exception):
+        default_output_mixer_channel({"devicetype": device_type, "options": ""}, 2)
+
+
+def test_load_labone_demod_csv(tmp_path):
+    fname = tmp_path / "dev2004_demods_0_sample_00000.csv"
+    fname.write_text(
+        "chunk;timestamp;x;y;freq;phase;dio;trigger;auxin0;auxin1\n"
+        "0;100;1.5e-03;-2.0e-03;1.0e+06;0.5;3;0;0.1;0.2\n"
+        "0;107;1.6e-03;-2.1e-03;1.0e+06;0.6;3;1;0.1;0.2\n"
+    )
+    sample = load_labone_demod_csv(fname, ("timestamp", "x", "trigger"))
+    assert sample.dtype.names == ("timestamp", "x", "trigger")
+    assert sample["timestamp"].dtype == np.uint64
+    np.testing.assert_array_equal(sample["timestamp"], [100, 107])
+    np.testing.assert_array_equal(sample["x"], [1.5e-3, 1.6e-3])
+    np.testing.assert_array_equal(sample["trigger"], [0, 1])
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "chunk;timestamp;value\n0;100;1.5e-03\n0;107;-2.0e-03\n",
+        "chunk;timestamp;value\n0;100;1\n0;107;1.5\n",
+        "chunk;timestamp;value\n0;100;on\n0;107;off\n",
+    ],
+)
+def test_load_labone_csv(tmp_path, content):
+    fname = tmp_path / "dev2004_pids_0_error_00000.csv"
+    fname.write_text(content)
+    data = load_labone_csv(fname)
+    expected = np.genfromtxt(fname, delimiter=";", dtype=None, names=True)
+    assert data.dtype == expected.dtype
+    np.testing.assert_array_equal(data, expected)
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        ["0.5,1.5e-03,-2.0e-03,1.0e+06,3,0.1,0.2", "0.6,1.6e-03,-2.1e-03,1e6,2,0.1,0"],
+        ["0.5,1.5e-03,,1.0e+06,3,0.1,0.2", "0.6,1.6e-03,-2.1e-03,1e6,2,0.1,0"],
+    ],
+)
+def test_load_zicontrol_csv(tmp_path, rows):
+    fname = tmp_path / "Freq1.csv"
+    fname.write_text("\n".join(rows) + "\n")
+    sample = load_zicontrol_csv(fname, ("t", "y", "dio"))
+    dtype = [("t", "f8"), ("y", "f8"), ("dio", "u4")]
+    expected = np.genfromtxt(fname, delimiter=",", dtype=dtype, usecols=(0, 2, 4))
+    assert sample.dtype == expected.dtype
+    for name in ("t", "y", "dio"):
+        np.testing.assert_array_equal(sample[name], expected[name])
+
+
+def test_load_zicontrol_zibin(tmp_path):
+    fname = tmp_path / "Freq1.ziBin"
+    data = np.array(
+        [
+            [0.5, 1.5e-3, -2.0e-3, 1.0e6, 3, 0.1, 0.2],
+            [0.6, 1.6e-3, -2.1e-3, 1.0e6, 2, 0.1, 0.2],
+        ]
+    )
+    data.astype(">f8").tofile(fname)
+    sample = load_zicontrol_zibin(fname, ("t", "y", "dio"))
+    assert isinstance(sample, np.recarray)
+    assert sample.dtype == np.dtype([("t", "f8"), ("y", "f8"), ("dio", "u4")])
+    np.testing.assert_array_equal(sample.t, data[:, 0])
+    np.testing.assert_array_equal(sample.y, data[:, 2])
+    np.testing.assert_array_equal(sample.dio, [3, 2])
+
+
+def test_check_for_sampleloss():
+    timestamps = np.array([0, 10, 20, 50, 60, 70, 90, 100])
+    with pytest.warns(UserWarning) as record:
+        index = check_for_sampleloss(timestamps)
+    np.testing.assert_array_equal(index, [2, 5])
+    assert len(record) == 1
+    assert str(record[0].message) == (
+        "Sample loss detected at timestamps=20 (index: 2, 3.0 points) and at 1 more "
+        "timestamps (up to 2.0 points)."
+    )
+
+
+def test_check_for_sampleloss_logs_each_occurrence(caplog):
+    timestamps = np.array([0, 10, 20, 50, 60, 70, 90, 100])
+    with caplog.at_level("DEBUG", logger="zhinst.utils"):
+        with pytest.warns(UserWarning):
+            check_for_sampleloss(timestamps)
+    assert "index: 2, 3.0 points" in caplog.text
+    assert "index: 5, 2.0 points" in caplog.text
+
+
+def test_check_for_sampleloss_without_loss():
+    timestamps = np.arange(0, 100, 10)
+    assert check_for_sampleloss(timestamps).size == 0
+
+
+@pytest.mark.parametrize("order, factor", [(1, 1.0), (4, 0.434979), (8, 0.300845)])
+def test_bwtc_scaling_factor(order, factor):
+    assert bwtc_scaling_factor(order) == factor
+
+
+@pytest.mark.parametrize("order", [0, 9, -1])
+def test_bwtc_scaling_factor_invalid_order(order):
+    with pytest.raises(RuntimeError, match="must be between 1 and 8"):
+        bwtc_scaling_factor(order)
+
+
+def test_bw2tc_tc2bw_arrays():
+    bandwidths = np.array([1.0, 10.0, 1e3])
+    timeconstants = bw2tc(bandwidths, 4)
+    np.testing.assert_allclose(timeconstants, 0.434979 / (2 * np.pi * bandwidths))
+    np.testing.assert_allclose(tc2bw(timeconstants, 4), bandwidths)
+    assert bw2tc(1.0, 1) == pytest.approx(1 / (2 * np.pi))
+
+
+@patch("zhinst.utils.utils.zi.ziDAQServer", MagicMock)
+def test_disable_everything_skips_missing_branches(daq):
+    nodes = {
+        "/dev2123/": ["DEMODS", "SIGINS", "SIGOUTS"],
+        "/dev2123/sigins/0/": ["AC", "DIFF"],
+        "/dev2123/sigouts/0/": ["ON", "ADD", "PRECOMPENSATION"],
+    }
+    daq.listNodes.side_effect = lambda path, flags: nodes.get(path, [])
+    settings = disable_everything(daq, "dev2123")
+    assert daq.listNodes.call_count == 3
+    paths = [path for path, _ in settings]
+    assert "/dev2123/sigins/*/diff" in paths
+    assert "/dev2123/sigins/*/float" not in paths
+    assert "/dev2123/sigouts/*/add" in paths
+    assert "/dev2123/sigouts/*/precompensation/enable" in paths
+    assert not any(path.startswith("/dev2123/pids") for path in paths)
+    daq.set.assert_called_once_with(settings)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_convert_awg_waveform_roundtrip(dtype):
+    wave1 = np.linspace(-1, 1, 9, dtype=dtype)
+    wave2 = np.linspace(1, -1, 9, dtype=dtype)
+    markers = np.arange(9) % 4
+    waveform = convert_awg_waveform(wave1, wave2, markers)
+    assert waveform.dtype == np.uint16
+    parsed = parse_awg_waveform(waveform, channels=2, markers_present=True)
+    np.testing.assert_allclose(parsed.wave1, wave1, atol=1 / 32767)
+    np.testing.assert_allclose(parsed.wave2, wave2, atol=1 / 32767)
+    np.testing.assert_array_equal(parsed.markers, markers)
+
+
+def test_volt_rms_to_dbm():
+    assert volt_rms_to_dbm(np.sqrt(0.05)) == pytest.approx(10 * np.log10(1))
+    volt_rms = np.array([1e-3, 0.1, -0.5, 0.2 + 0.1j])
+    np.testing.assert_allclose(
+        volt_rms_to_dbm(volt_rms, 1e6),
+        10 * np.log10(np.abs(volt_rms) ** 2 * 1e3 / 1e6),
+    )
+
+
+@patch("zhinst.utils.utils.scipy", create=True)
+def test_load_labone_mat_variable_names(scipy):
+    data = load_labone_mat("data.mat", variable_names=["dev2123"])
+    scipy.io.loadmat.assert_called_once_with("data.mat", variable_names=["dev2123"])
+    assert data is scipy.io.loadmat.return_value
+
+
+@pytest.mark.parametrize("systemtime", [1650000000123456, np.uint64(1650000000123456)])
+def test_systemtime_to_datetime(systemtime):
+    expected = datetime.datetime.fromtimestamp(1650000000).replace(microsecond=123456)
+    assert systemtime_to_datetime(systemtime) == expected
+
+
+def test_parse_awg_waveform_does_not_alias_input():
+    waveform = np.array([32767, 1, 32769, 0], dtype=np.uint16)
+    parsed = parse_awg_waveform(waveform, channels=1, markers_present=True)
+    np.testing.assert_allclose(parsed.wave1, [1.0, -32767 / 32767])
+    np.testing.assert_array_equal(parsed.markers, [1, 0])
+    parsed.markers[:] = 3
+    np.testing.assert_array_equal(waveform, [32767, 1, 32769, 0])
+    assert parse_awg_waveform(list(waveform)).wave1[0] == 1.0
+
+
+def test_convert_awg_waveform_saturates():
+    waveform = convert_awg_waveform(np.array([1.5, -1.5, 1.0, -1.0, -0.5]))
+    np.testing.assert_array_equal(
+        waveform.view(np.int16), [32767, -32768, 32767, -32767, -16383]
+    )
+
+
+@pytest.fixture
+def discovery_cache():
+    yield
+    clear_discovery_cache()
+
+
+@patch.dict("zhinst.utils.utils._CONNECTED_INTERFACES")
+@patch("zhinst.utils.utils.zi", autospec=True)
+def test_create_api_session_tries_last_interface_first(zi, discovery_cache):
+    zi.ziDiscovery.return_value.find.return_value = "dev2123"
+    zi.ziDiscovery.return_value.get.return_value = {
+        "serveraddress": "127.0.0.1",
+        "serverport": 8004,
+        "devicetype": "UHFLI",
+        "discoverable": True,
+        "available": True,
+        "interfaces": ["1GbE", "USB"],
+    }
+    daq = zi.ziDAQServer.return_value
+    daq.connectDevice.side_effect = [RuntimeError, None, None]
+    create_api_session("dev2123", 6)
+    create_api_session("dev2123", 6)
+    zi.ziDiscovery.return_value.find.assert_called_once_with("dev2123")
+    assert [call[0][1] for call in daq.connectDevice.call_args_list] == [
+        "1GbE",
+        "USB",
+        "USB",
+    ]
+
+
+@patch("zhinst.utils.utils.time.monotonic")
+@patch("zhinst.utils.utils.zi", autospec=True)
+def test_create_api_session_discovery_expires(zi, monotonic, discovery_cache):
+    zi.ziDiscovery.return_value.find.return_value = "dev2123"
+    zi.ziDiscovery.return_value.get.return_value = {
+        "serveraddress": "127.0.0.1",
+        "serverport": 8004,
+        "devicetype": "MFLI",
+        "discoverable": True,
+        "available": True,
+        "interfaces": ["1GbE"],
+    }
+    for now in (0.0, 5.0, 20.0):
+        monotonic.return_value = now
+        _, _, props = create_api_session("mf-dev2123", 6)
+        props["available"] = False
+    assert zi.ziDiscovery.return_value.find.call_count == 2
+    clear_discovery_cache()
+    create_api_session("dev2123", 6)
+    assert zi.ziDiscovery.return_value.find.call_count == 3
+
+
+@patch.dict("zhinst.utils.utils._CONNECTED_INTERFACES")
+@patch("zhinst.utils.utils.zi", autospec=True)
+def test_create_api_session_failure_discards_discovery(zi, discovery_cache):
+    zi.ziDiscovery.return_value.find.return_value = "dev2123"
+    zi.ziDiscovery.return_value.get.return_value = {
+        "serveraddress": "127.0.0.1",
+        "serverport": 8004,
+        "devicetype": "MFLI",
+        "discoverable": True,
+        "available": True,
+        "interfaces": ["1GbE"],
+    }
+    zi.ziDAQServer.return_value.connectDevice.side_effect = RuntimeError
+    with pytest.raises(RuntimeError):
+        create_api_session("dev2123", 6)
+    zi.ziDAQServer.return_value.connectDevice.side_effect = None
+    create_api_session("dev2123", 6)
+    assert zi.ziDiscovery.return_value.find.call_count == 2
+
+
+@patch("zhinst.utils.utils.socket.gethostbyname", return_value="10.42.0.1")
+@patch("zhinst.utils.utils.zi", autospec=True)
+def test_create_api_session_resolves_host_once(zi, gethostbyname, discovery_cache):
+    zi.ziDiscovery.return_value.find.return_value = "dev2123"
+    zi.ziDiscovery.return_value.get.return_value = {
+        "serveraddress": "10.42.0.1",
+        "devicetype": "UHFLI",
+        "available": True,
+        "interfaces": ["1GbE"],
+    }
+    for _ in range(2):
+        create_api_session("dev2123", 6, server_host="labpc")
+    gethostbyname.assert_called_once_with("labpc")
+    zi.ziDAQServer.assert_called_with("10.42.0.1", 8004, 6)
+
+
+def test_api_server_version_check_queries_server_once(daq):
+    daq.version.return_value = "23.06"
+    daq.get.return_value = {
+        "/zi/about/version": {"value": ["23.02"]},
+        "/zi/about/revision": {"value": [42]},
+    }
+    with pytest.warns(UserWarning, match="23.02"):
+        assert not api_server_version_check(daq)
+    with pytest.warns(UserWarning):
+        api_server_version_check(daq)
+    daq.get.assert_called_once_with("/zi/about/version,/zi/about/revision", flat=True)
+    daq.getString.assert_not_called()
+
+
+@patch("zhinst.utils.utils.zi.ziDAQServer", MagicMock)
+def test_auto_detect_lists_nodes_once(daq):
+    daq.listNodes.return_value = ["ZI", "DEV2123", "DEV2006"]
+    assert autoDetect(daq, exclude="dev2123") == "dev2006"
+    daq.listNodes.assert_called_once_with("/", 0)
+
+
+@patch("zhinst.utils.utils.zi.ziDAQServer", MagicMock)
+def test_auto_detect_logs_selected_device(daq, caplog):
+    daq.listNodes.return_value = ["ZI", "DEV2123"]
+    with caplog.at_level("INFO", logger="zhinst.utils"):
+        autoDetect(daq)
+    assert "autoDetect selected the device dev2123" in caplog.text
+
+
+@patch("zhinst.utils.utils.time.sleep")
+def test_load_settings_polls_with_backoff(sleep, daq):
+    device_settings = daq.deviceSettings.return_value
+    device_settings.finished.side_effect = [False] * 8 + [True]
+    load_settings(daq, "dev2123", "settings/my_settings.xml")
+    device_settings.set.assert_any_call("filename", "my_settings")
+    device_settings.set.assert_any_call("path", "settings")
+    sleep_times = [call[0][0] for call in sleep.call_args_list]
+    assert sleep_times == [0.001, 0.002, 0.004, 0.008, 0.016, 0.032, 0.05, 0.05]
+    device_settings.clear.assert_not_called()
+
+
+def test_settings_reuse_device_settings_module(daq):
+    device_settings = daq.deviceSettings.return_value
+    device_settings.finished.return_value = True
+    save_settings(daq, "dev2123", "my_settings.xml")
+    load_settings(daq, "dev2123", "my_settings.xml")
+    daq.deviceSettings.assert_called_once()
+    assert device_settings.execute.call_count == 2
+    device_settings.set.assert_called_with("command", "load")
+
+
+@patch("zhinst.utils.utils.time.monotonic", side_effect=[0, 0, 61, 0])
+@patch("zhinst.utils.utils.time.sleep")
+def test_load_settings_timeout_clears_module(sleep, monotonic, daq):
+    device_settings = daq.deviceSettings.return_value
+    device_settings.finished.return_value = False
+    with pytest.raises(RuntimeError, match="Unable to load device settings"):
+        load_settings(daq, "dev2123", "my_settings.xml")
+    device_settings.clear.assert_called_once()
+    device_settings.finished.return_value = True
+    load_settings(daq, "dev2123", "my_settings.xml")
+    assert daq.deviceSettings.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "filename, path",
+    [
+        ("my_settings.xml", "." + os.sep),
+        (Path("settings") / "my_settings.xml", str(Path("settings"))),
+    ],
+)
+def test_save_settings_path(daq, filename, path):
+    device_settings = daq.deviceSettings.return_value
+    device_settings.finished.return_value = True
+    save_settings(daq, "dev2123", filename)
+    device_settings.set.assert_any_call("filename", "my_settings")
+    device_settings.set.assert_any_call("path", path)
+    device_settings.set.assert_any_call("command", "save")
+
+
+@patch("zhinst.utils.utils.zi.ziDAQServer", MagicMock)
+def test_devices(daq):
+    daq.listNodes.return_value = ["ZI", "DEV2123", "DEBUG", "dev2006"]
+    assert devices(daq) == ["dev2123", "dev2006"]